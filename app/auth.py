@@ -0,0 +1,42 @@
+import hashlib
+import hmac
+import os
+from typing import Optional
+
+AUTH_SECRET = os.getenv("STUDYMON_AUTH_SECRET")     # signs user tokens; unset = no user accounts, only the default database
+AUTH_HEADER = "Authorization"                       # "Bearer <token>", picks the user's shard
+
+def sign(user_id: str, secret: str) -> str:
+    return hmac.new(secret.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+
+def issue_token(user_id: str, secret: Optional[str] = None) -> str:
+    """
+    A user's API token, "<user id>.<HMAC-SHA256 of the user id>".
+    Tokens hold no state on the server: anyone with the secret can check one, nobody without it can make one.
+    """
+    secret = secret or AUTH_SECRET
+    if not secret:
+        raise RuntimeError("STUDYMON_AUTH_SECRET is not set")
+    return f"{user_id}.{sign(user_id, secret)}"
+
+def verify_token(token: str, secret: Optional[str] = None) -> Optional[str]:
+    """The user id a token was issued for, None if it wasn't signed with the secret"""
+    secret = secret or AUTH_SECRET
+    user_id, _, signature = token.rpartition(".")
+    if not secret or not user_id:
+        return None
+    if not hmac.compare_digest(signature, sign(user_id, secret)):
+        return None
+    return user_id
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """The token of an "Authorization: Bearer <token>" header (None if there's no such header)"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+# auth.py issues and checks the bearer tokens that identify a user (and so their shard,
+# see database.py); tokens are handed out by POST /admin/users/{user_id} (routers/admin.py).
@@ -0,0 +1,187 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import Integer, bindparam, case, cast, func, update
+from sqlmodel import Session, select
+from app.database import open_session
+from app.models import StudySession, Topic
+from app.events import publish_after_commit
+from app.rollups import apply_session_to_rollup
+from typing import Dict, Optional, Tuple
+from app.pokemon.pokemon_utils import (fetch_pokemon_data, set_evolution_target, calculate_level_from_exp,
+                                       calculate_levels_from_exp, check_evolution, EVOLUTION_DATA, EXP_PER_MINUTE)
+
+def apply_level_up(topic: Topic) -> Optional[Dict]:
+    """
+    Recompute a topic's level from its EXP and evolve at most once if it leveled up.
+    Returns the evolution data if it evolved.
+    """
+    old_level = topic.pokemon_level
+    new_level, _ = calculate_level_from_exp(topic.pokemon_exp, topic.growth_rate)
+    topic.pokemon_level = new_level
+    
+    # Check for evolution (a dictionary lookup, no PokéAPI call inside the transaction)
+    if new_level <= old_level:
+        return None
+    evolution_check = check_evolution(topic.pokemon_id, new_level)
+    if not evolution_check:
+        return None
+    
+    # Evolve the Pokémon!
+    evolution_data = {
+        "evolved": True,
+        "from_name": topic.pokemon_name,
+        "from_id": topic.pokemon_id,
+        "to_name": evolution_check["evolves_to_name"],
+        "to_id": evolution_check["evolves_to_id"],
+        "at_level": new_level
+    }
+    topic.pokemon_id = evolution_check["evolves_to_id"]
+    topic.pokemon_name = evolution_check["evolves_to_name"]
+    topic.pokemon_sprite_url = evolution_check["evolves_to_sprite"]
+    return evolution_data
+
+def queue_level_events(db: Session, topic: Topic, old_level: int, evolution_data: Optional[Dict]) -> None:
+    """Level-up/evolution events for subscribers, sent once the transaction commits"""
+    if topic.pokemon_level > old_level:
+        publish_after_commit(db, "level_up", {
+            "topic_id": topic.id,
+            "pokemon_id": topic.pokemon_id,
+            "from_level": old_level,
+            "to_level": topic.pokemon_level,
+        })
+    if evolution_data:
+        publish_after_commit(db, "evolution", {"topic_id": topic.id, **evolution_data})
+
+def increment_topic_progress(db: Session, topic_id: int, minutes: int) -> Tuple[Optional[Topic], Optional[Dict]]:
+    """
+    Add study minutes to a topic: total minutes, EXP and status are incremented
+    in the database (no read-modify-write, so concurrent calls can't lose updates),
+    then the level/evolution pass runs on the values the UPDATE returned.
+    Returns (topic values, evolution data), or (None, None) if the topic doesn't exist.
+    """
+    row = db.exec(
+        update(Topic)
+        .where(Topic.id == topic_id)
+        .values(
+            minutes_spent = Topic.minutes_spent + minutes,
+            pokemon_exp = case((Topic.pokemon_id != None, Topic.pokemon_exp + minutes * EXP_PER_MINUTE), else_ = Topic.pokemon_exp),
+            status = case((Topic.status == "not_started", "in_progress"), else_ = Topic.status),
+        )
+        .returning(Topic.id, Topic.minutes_spent, Topic.status, Topic.pokemon_id, Topic.pokemon_name,
+                   Topic.pokemon_sprite_url, Topic.pokemon_level, Topic.pokemon_exp, Topic.growth_rate)
+    ).first()
+    if row is None:
+        return None, None
+
+    topic = Topic(**row._mapping)   # detached copy, only used to run the level/evolution pass
+    if not topic.pokemon_id:
+        return topic, None
+    old_level = topic.pokemon_level
+    evolution_data = apply_level_up(topic)
+    queue_level_events(db, topic, old_level, evolution_data)
+    if topic.pokemon_level != old_level:
+        db.exec(
+            update(Topic)
+            .where(Topic.id == topic_id)
+            .values(
+                pokemon_level = topic.pokemon_level,
+                pokemon_id = topic.pokemon_id,
+                pokemon_name = topic.pokemon_name,
+                pokemon_sprite_url = topic.pokemon_sprite_url,
+            )
+        )
+    return topic, evolution_data
+
+def close_session(db: Session, session_id: int, end_time: datetime, paused_seconds: float = 0,
+                  max_minutes: Optional[int] = None) -> Tuple[Optional[StudySession], Optional[Topic], Optional[Dict]]:
+    """
+    End an open session at end_time. The duration is computed in SQL from its start_time
+    (whole minutes, minus time spent paused), capped at max_minutes if given (a client's own,
+    shorter count); then the minutes go to the topic and the daily rollup and a session_ended
+    event is queued, all in the caller's transaction.
+    Returns (session, topic values, evolution data), or (None, None, None) if the session isn't open.
+    """
+    elapsed_seconds = (func.julianday(end_time) - func.julianday(StudySession.start_time)) * 86400 - paused_seconds
+    duration_minutes = func.max(0, cast(elapsed_seconds / 60, Integer))
+    if max_minutes is not None:
+        duration_minutes = func.min(duration_minutes, max_minutes)     # never more than really elapsed
+    # close only if still open; RETURNING saves a re-read afterwards
+    ended = db.exec(
+        update(StudySession)
+        .where(StudySession.id == session_id, StudySession.end_time == None)
+        .values(end_time = end_time, duration_minutes = duration_minutes)
+        .returning(*StudySession.__table__.columns)
+    ).first()
+    if ended is None:
+        return None, None, None
+    study_session = StudySession(**ended._mapping)
+
+    # topic's total minutes, EXP, level and evolution (increments happen in SQL)
+    topic, evolution_data = increment_topic_progress(db, study_session.topic_id, study_session.duration_minutes)
+    apply_session_to_rollup(db, study_session)     # daily totals commit with the session
+    publish_after_commit(db, "session_ended", {
+        "session": study_session.model_dump(exclude = {"client_key"}),
+        "topic": topic.model_dump(include = {"id", "status", "minutes_spent", "pokemon_id", "pokemon_level", "pokemon_exp"}) if topic else None,
+    })
+    return study_session, topic, evolution_data
+
+def needs_hydration(topic: Topic) -> bool:
+    """An evolution target that wasn't precomputed leaves the name/sprite empty until hydrate_topic_pokemon runs"""
+    return bool(topic.pokemon_id) and (not topic.pokemon_name or not topic.pokemon_sprite_url)
+
+def hydrate_topic_pokemon(topic_id: int, pokemon_id: int, user_id: Optional[str] = None) -> None:
+    """
+    Fill in the name/sprite of a topic's Pokémon after the request that evolved it has committed.
+    Runs as a background task, so a slow PokéAPI never holds the database write lock.
+    """
+    pokemon_data = fetch_pokemon_data(pokemon_id)
+    if not pokemon_data:
+        return
+
+    # remember the target, so the next evolution into it needs no hydration
+    for from_id, (evolution_id, required_level) in EVOLUTION_DATA.items():
+        if evolution_id == pokemon_id:
+            set_evolution_target(from_id, evolution_id, required_level, pokemon_data)
+
+    with open_session(user_id) as db:
+        topic = db.get(Topic, topic_id)
+        if not topic or topic.pokemon_id != pokemon_id:   # deleted, or evolved/reassigned since
+            return
+        topic.pokemon_name = pokemon_data["name"]
+        topic.pokemon_sprite_url = pokemon_data["sprite_url"]
+        db.add(topic)
+        db.commit()
+
+def recalculate_levels(db: Session) -> int:
+    """
+    Recompute pokemon_level for every topic with a Pokémon, one batch per growth curve.
+    Returns how many topics changed level.
+    """
+    rows = db.exec(
+        select(Topic.id, Topic.pokemon_exp, Topic.pokemon_level, Topic.growth_rate)
+        .where(Topic.pokemon_id != None)
+    ).all()
+
+    by_curve = defaultdict(list)
+    for row in rows:
+        by_curve[row.growth_rate].append(row)
+
+    changes = []
+    for growth_rate, curve_rows in by_curve.items():
+        levels = calculate_levels_from_exp([row.pokemon_exp for row in curve_rows], growth_rate)
+        changes.extend(
+            {"topic_id": row.id, "level": level}
+            for row, level in zip(curve_rows, levels)
+            if level != row.pokemon_level
+        )
+
+    if changes:
+        db.connection().execute(
+            update(Topic).where(Topic.id == bindparam("topic_id")).values(pokemon_level = bindparam("level")),
+            changes,
+        )
+        db.commit()
+    return len(changes)
+
+# crud.py holds database work that isn't tied to a single route,
+# like the background backfill of evolved Pokémon data above.
@@ -1,12 +1,228 @@
-from sqlmodel import SQLModel, create_engine, Session
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
-DATABASE_URL = "sqlite:///database.db"          # creates a sql file for data
-engine = create_engine(DATABASE_URL, echo=True) # engine connects to database.db and sends sql commands and recieves data
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlmodel import create_engine, Session
 
-def get_session():
-    with Session(engine) as session:    # a session is an interaction with the database
-        yield session                   # 
+from app.auth import AUTH_HEADER, bearer_token, verify_token
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")   # creates a sql file for data
+ENVIRONMENT = os.getenv("STUDYMON_ENV", "development")              # picks one of ENGINE_PROFILES
+SHARD_DIR = Path(os.getenv("STUDYMON_SHARD_DIR", "shards"))         # one SQLite file per user: shards/<user id>.db
+MAX_OPEN_SHARDS = int(os.getenv("STUDYMON_MAX_OPEN_SHARDS", "64"))  # shard engines kept open, least recently used are closed
+
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")  # also the shard's file name, so no dots or slashes
+USER_KEY = "user_id"                                # Session.info key holding the user a session belongs to
+
+# SQLite settings applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # readers don't block the writer (and vice versa)
+    "synchronous": "NORMAL",        # safe with WAL, one fsync per checkpoint instead of per commit
+    "busy_timeout": 5000,           # ms to wait for the write lock instead of failing straight away
+    "mmap_size": 256 * 1024 * 1024, # read pages through the OS page cache
+    "cache_size": -64 * 1024,       # 64 MB page cache per connection (negative = KiB)
+    "temp_store": "MEMORY",         # GROUP BY / ORDER BY temp b-trees stay in memory
+}
+
+ENGINE_PROFILES = {
+    "development": {"echo": True, "pool_size": 5, "max_overflow": 10, "pragmas": SQLITE_PRAGMAS},
+    "production": {"echo": False, "pool_size": 20, "max_overflow": 20, "pragmas": SQLITE_PRAGMAS},
+    "test": {"echo": False, "pool_size": 5, "max_overflow": 10, "pragmas": {**SQLITE_PRAGMAS, "synchronous": "OFF"}},
+}
+
+def build_engine(url: str = DATABASE_URL, profile: str = ENVIRONMENT):
+    """Create an engine using one of ENGINE_PROFILES (pragmas are applied on connect)"""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown STUDYMON_ENV {profile!r}: use one of {', '.join(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+    options = {"echo": settings["echo"]}
+    if url.startswith("sqlite"):
+        # FastAPI runs sync routes in a threadpool, so connections move between threads
+        options["connect_args"] = {"check_same_thread": False}
+        if url not in ("sqlite://", "sqlite:///:memory:"):     # in-memory databases can't be pooled
+            options["pool_size"] = settings["pool_size"]
+            options["max_overflow"] = settings["max_overflow"]
+    db_engine = create_engine(url, **options)
+
+    if url.startswith("sqlite"):
+        @event.listens_for(db_engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in settings["pragmas"].items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+    return db_engine
+
+engine = build_engine() # engine connects to database.db and sends sql commands and recieves data
+
+class UnknownUser(LookupError):
+    """The user has no shard: it was never provisioned (see ShardRouter.create)"""
+
+class ShardRouter:
+    """
+    Maps each user to their own SQLite file, so writes of different users never wait on the same lock.
+    - shard files are only made by create() (POST /admin/users/{user_id}), opening a shard
+      that isn't on disk raises UnknownUser instead of creating it
+    - a shard's engine is opened on first use (schema upgraded then, see ensure_schema)
+      and kept in a bounded LRU; past max_open the least recently used engine is disposed
+    - user None is the default database (DATABASE_URL), for requests without a user token
+    - borrow() lends an engine for one-off scans (admin totals, the session reaper)
+      without pushing active users out of the LRU
+    """
+
+    def __init__(self, directory: Path = SHARD_DIR, max_open: int = MAX_OPEN_SHARDS, default_engine = engine):
+        self.directory = Path(directory)
+        self.max_open = max_open
+        self.default_engine = default_engine
+        self._engines: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()           # guards _engines
+        self._open_lock = threading.Lock()      # one shard open (and schema check) at a time
+        self.counters = {"hits": 0, "opens": 0, "evictions": 0}
+
+    def path_for(self, user_id: str) -> Path:
+        return self.directory / f"{user_id}.db"
+
+    def url_for(self, user_id: str) -> str:
+        return f"sqlite:///{self.path_for(user_id)}"
+
+    def exists(self, user_id: str) -> bool:
+        """Whether a user has a shard (an open engine, or a file on disk)"""
+        with self._lock:
+            if user_id in self._engines:
+                return True
+        return self.path_for(user_id).is_file()
+
+    def create(self, user_id: str) -> bool:
+        """Provision a user's shard (schema included); False if it already existed"""
+        if not USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user id {user_id!r}: use 1-64 letters, digits, '-' or '_'")
+        with self._open_lock:
+            if self.exists(user_id):
+                return False
+            self.directory.mkdir(parents = True, exist_ok = True)
+            self._open(user_id, instrument = False, create = True).dispose()
+        return True
+
+    def _open(self, user_id: str, instrument: bool = True, create: bool = False):
+        from app.migrations import ensure_schema       # imported here: migrations imports this module
+        from app.metrics import instrument_engine
+        if not create and not self.path_for(user_id).is_file():
+            raise UnknownUser(user_id)                  # SQLite would create the file on connect
+        db_engine = build_engine(self.url_for(user_id))
+        ensure_schema(db_engine)                        # a PRAGMA read for shards that are up to date
+        if instrument:
+            instrument_engine(db_engine)
+        return db_engine
+
+    def engine_for(self, user_id: Optional[str]):
+        """
+        The engine of a user's shard, opening it (and closing the least recently used one) if needed.
+        Raises UnknownUser if the user has no shard.
+        """
+        if user_id is None:
+            return self.default_engine
+        with self._lock:
+            db_engine = self._engines.get(user_id)
+            if db_engine is not None:
+                self._engines.move_to_end(user_id)
+                self.counters["hits"] += 1
+                return db_engine
+
+        evicted = []
+        with self._open_lock:
+            with self._lock:
+                db_engine = self._engines.get(user_id)     # another request may have opened it meanwhile
+            if db_engine is None:
+                db_engine = self._open(user_id)
+                with self._lock:
+                    self._engines[user_id] = db_engine
+                    self.counters["opens"] += 1
+                    while len(self._engines) > self.max_open:
+                        _, old_engine = self._engines.popitem(last = False)
+                        evicted.append(old_engine)
+                        self.counters["evictions"] += 1
+        for old_engine in evicted:
+            old_engine.dispose()    # connections still checked out are closed when they're returned
+        return db_engine
+
+    @contextmanager
+    def borrow(self, user_id: Optional[str]) -> Iterator:
+        """An engine for a one-off scan: the open one if the shard is in the LRU, else a temporary one"""
+        if user_id is None:
+            yield self.default_engine
+            return
+        with self._lock:
+            db_engine = self._engines.get(user_id)
+        if db_engine is not None:
+            yield db_engine
+            return
+        with self._open_lock:
+            db_engine = self._open(user_id, instrument = False)
+        try:
+            yield db_engine
+        finally:
+            db_engine.dispose()
+
+    def users(self) -> List[str]:
+        """Every user that has a shard on disk"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.db") if USER_ID_PATTERN.match(path.stem))
+
+    def close(self) -> None:
+        """Dispose every open shard engine (call on shutdown)"""
+        with self._lock:
+            engines, self._engines = list(self._engines.values()), OrderedDict()
+        for db_engine in engines:
+            db_engine.dispose()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "open": len(self._engines), "max_open": self.max_open}
+
+shard_router = ShardRouter()
+
+def user_from_request(request: Request) -> Optional[str]:
+    """
+    The user a request is for, from its bearer token (see auth.py); None for the default database.
+    401 for a token that wasn't issued by this server, 404 for a user without a shard.
+    """
+    authorization = request.headers.get(AUTH_HEADER)
+    if authorization is None:
+        return None
+    token = bearer_token(authorization)
+    user_id = verify_token(token) if token else None
+    if user_id is None or not USER_ID_PATTERN.match(user_id):
+        raise HTTPException(status_code = 401, detail = "Invalid token", headers = {"WWW-Authenticate": "Bearer"})
+    if not shard_router.exists(user_id):
+        raise HTTPException(status_code = 404, detail = "Unknown user")
+    return user_id
+
+def open_session(user_id: Optional[str] = None) -> Session:
+    """A session on a user's shard, tagged with the user so after-commit hooks know whose data changed"""
+    return Session(shard_router.engine_for(user_id), info = {USER_KEY: user_id})
+
+def user_of(db: Session) -> Optional[str]:
+    return db.info.get(USER_KEY)
+
+def get_session(request: Request):
+    try:
+        session = open_session(user_from_request(request))
+    except UnknownUser:                                         # shard removed since the token was checked
+        raise HTTPException(status_code = 404, detail = "Unknown user")
+    with session:                                               # a session is an interaction with the database
+        yield session                                           # (on the requesting user's shard)
 
 # This sets up a SQLite database file (database.db) if it doesn't exist,
 # and creates an "engine" + session provider to communicate with it.
-# The session allows routes to read from and write to the database safely.
\ No newline at end of file
+# The engine profile (STUDYMON_ENV=development|production|test) controls SQL logging,
+# connection pooling and the SQLite pragmas (WAL, synchronous, busy timeout, mmap, cache).
+# The session allows routes to read from and write to the database safely.
+# With a user's bearer token, get_session() routes the request to that user's own SQLite
+# file under shards/ instead (ShardRouter), so users don't contend on one write lock.
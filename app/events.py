@@ -0,0 +1,191 @@
+import asyncio
+import itertools
+import json
+import signal
+import threading
+from typing import Any, Dict, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.database import USER_KEY
+
+MAX_QUEUED_EVENTS = 100         # per subscriber, the oldest event is dropped when a slow client falls behind
+MAX_SUBSCRIBERS = 10000         # open streams per worker, more get a 503
+KEEPALIVE_SECONDS = 15          # comment frame that keeps proxies from closing idle streams
+KEEPALIVE_FRAME = b": keepalive\n\n"
+PENDING_EVENTS_KEY = "pending_events"
+SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+class Subscriber:
+    """One open event stream: a bounded queue of encoded SSE frames"""
+
+    __slots__ = ("queue", "types", "user", "dropped", "reported")
+
+    def __init__(self, max_queued: int, types: Optional[Set[str]] = None, user: Optional[str] = None):
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(max_queued)
+        self.types = types          # None = every event type
+        self.user = user            # only hears about this user's data (None = the default database)
+        self.dropped = 0
+        self.reported = 0
+
+    def push(self, event_type: str, frame: Optional[bytes]) -> bool:
+        """Queue a frame without ever blocking the publisher; returns False if an older frame had to go"""
+        if frame is KEEPALIVE_FRAME:
+            if self.queue.empty():      # a stream with events waiting isn't idle
+                self.queue.put_nowait(frame)
+            return True
+        if frame is not None and self.types is not None and event_type not in self.types:
+            return True
+        kept = True
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            kept = False
+        self.queue.put_nowait(frame)
+        return kept
+
+def encode_frame(event_id: Optional[int], event_type: str, data: Any) -> bytes:
+    """Server-Sent Events wire format, encoded once and shared by every subscriber"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event_type}\ndata: {json.dumps(jsonable_encoder(data))}\n\n".encode()
+
+class EventBus:
+    """
+    In-process publish/subscribe for topic and session changes.
+    - publish() can be called from any thread (sync routes run in a threadpool);
+      delivery always happens on the event loop that owns the subscribers
+    - each event is serialized once, subscribers only hold references to the same bytes
+    - queues are bounded: a subscriber that doesn't keep up loses its oldest events
+      (and is told how many), the publisher and the other subscribers never wait for it
+    - publish() with no subscribers is a cheap no-op, so write paths pay nothing by default
+    - one keepalive timer serves every subscriber, an idle stream is just a queue waiting on get()
+    - events belong to a user (from the bearer token, None for the default database), subscribers only get their own
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED_EVENTS, max_subscribers: int = MAX_SUBSCRIBERS,
+                 keepalive: float = KEEPALIVE_SECONDS):
+        self.max_queued = max_queued
+        self.max_subscribers = max_subscribers
+        self.keepalive = keepalive
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()   # guards _ids
+        self.counters = {"published": 0, "delivered": 0, "dropped": 0, "rejected": 0}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, types: Optional[Set[str]] = None, user: Optional[str] = None) -> Optional[Subscriber]:
+        """Open a subscription (call from the event loop), returns None when the worker is full"""
+        if len(self._subscribers) >= self.max_subscribers:
+            self.counters["rejected"] += 1
+            return None
+        self._loop = asyncio.get_running_loop()
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = self._loop.create_task(self._send_keepalives())
+        subscriber = Subscriber(self.max_queued, types, user)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event_type: str, data: Any, user: Optional[str] = None) -> None:
+        """Send an event to every subscriber of a user, from any thread"""
+        if not self._subscribers:
+            return
+        with self._lock:
+            event_id = next(self._ids)
+        frame = encode_frame(event_id, event_type, data)
+        self.counters["published"] += 1
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and running is self._loop:
+            self._deliver(event_type, frame, user)
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event_type, frame, user)
+        except RuntimeError:
+            pass    # loop already closed (shutdown), nobody is listening anymore
+
+    async def _send_keepalives(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.keepalive)
+            self._deliver("keepalive", KEEPALIVE_FRAME)
+
+    def _deliver(self, event_type: str, frame: Optional[bytes], user: Optional[str] = None) -> None:
+        for subscriber in list(self._subscribers):
+            if frame is KEEPALIVE_FRAME:
+                subscriber.push(event_type, frame)
+            elif frame is not None and subscriber.user != user:
+                continue
+            elif subscriber.push(event_type, frame):
+                self.counters["delivered"] += 1
+            else:
+                self.counters["dropped"] += 1
+
+    def close(self) -> None:
+        """End every open stream (call on shutdown, so they don't hold the server open)"""
+        if self._subscribers and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._deliver, "close", None)
+            except RuntimeError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "subscribers": len(self._subscribers)}
+
+event_bus = EventBus()
+
+# Set once the server has been told to stop. Uvicorn waits for open responses to finish before
+# it runs the lifespan shutdown, so streams have to notice this themselves and end
+# (event_bus.close() from the lifespan would come too late, it never runs while a stream is open).
+shutting_down = threading.Event()
+
+def watch_for_shutdown() -> None:
+    """
+    Chain a handler in front of the server's SIGINT/SIGTERM handlers that sets shutting_down.
+    Call on startup, after the server installed its own handlers (uvicorn does before the lifespan runs).
+    """
+    shutting_down.clear()
+    if threading.current_thread() is not threading.main_thread():
+        return      # signals can only be handled on the main thread (e.g. the app runs under a test client)
+    for sig in SHUTDOWN_SIGNALS:
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            shutting_down.set()
+            event_bus.close()       # wakes every idle stream now, instead of at its next poll
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL and signum == signal.SIGINT:
+                raise KeyboardInterrupt
+
+        signal.signal(sig, handler)
+
+def publish_after_commit(db: Session, event_type: str, data: Any) -> None:
+    """
+    Queue an event on a database session; it's published only once the session commits
+    (and discarded on rollback), so subscribers never hear about writes that didn't happen.
+    """
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append((event_type, data))
+
+@event.listens_for(Session, "after_commit")
+def publish_pending_events(session):
+    for event_type, data in session.info.pop(PENDING_EVENTS_KEY, []):
+        event_bus.publish(event_type, data, session.info.get(USER_KEY))
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_events(session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+# events.py is the real-time side of the API: write paths queue events with
+# publish_after_commit(), and routers/events.py streams them to clients as Server-Sent Events.
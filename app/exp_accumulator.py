@@ -0,0 +1,247 @@
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, bindparam, case, update
+from sqlmodel import select
+
+from app.database import open_session
+from app.models import Topic
+from app.crud import apply_level_up, hydrate_topic_pokemon, needs_hydration, queue_level_events
+from app.events import publish_after_commit
+from app.pokemon.pokemon_utils import calculate_level_from_exp
+
+FLUSH_INTERVAL_SECONDS = 1.0
+MAX_PENDING_UPDATES = 200       # buffered add() calls that trigger an early flush
+READ_ATTEMPTS = 3               # read() retries while flushes commit, then waits for the flush lock
+
+T = TypeVar("T")
+Deltas = Dict[int, Dict[str, int]]      # topic id -> {"exp": ..., "minutes": ...}
+
+class ExpAccumulator:
+    """
+    Buffers EXP/minute deltas per topic and writes them in batches, so bursts of
+    progress updates cost one transaction per flush instead of one per update.
+    - flushes every flush_interval seconds, or early once max_pending updates are buffered
+    - increments run in SQL (SET pokemon_exp = pokemon_exp + ?), so nothing is lost to races
+    - levels/evolutions are recomputed once per topic per flush
+    - read() runs a database read and takes the deltas that weren't in the database at that
+      moment, merge() adds them to the rows read (see read() for how the two stay consistent)
+    - deltas are kept per user (shard), and each user's shard gets its own transaction
+    """
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL_SECONDS, max_pending: int = MAX_PENDING_UPDATES):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[Optional[str], int], Dict[str, int]] = {}    # (user id, topic id) -> delta
+        self._in_flight: Dict[Tuple[Optional[str], int], Dict[str, int]] = {}  # taken by a flush, not committed yet
+        self._commits: Dict[Optional[str], int] = {}    # user id -> commit counter, odd while a commit lands
+        self._pending_updates = 0
+        self._lock = threading.Lock()           # guards _pending, _in_flight and _commits
+        self._flush_lock = threading.Lock()     # one flush at a time
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"updates": 0, "flushes": 0, "topics_flushed": 0}
+
+    def add(self, topic_id: int, exp: int = 0, minutes: int = 0, user_id: Optional[str] = None) -> None:
+        """Buffer a progress delta for a topic"""
+        with self._lock:
+            delta = self._pending.setdefault((user_id, topic_id), {"exp": 0, "minutes": 0})
+            delta["exp"] += exp
+            delta["minutes"] += minutes
+            self._pending_updates += 1
+            self.counters["updates"] += 1
+            full = self._pending_updates >= self.max_pending
+
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def pending(self, topic_id: int, user_id: Optional[str] = None) -> Dict[str, int]:
+        """Deltas for a topic that aren't in the database yet (buffered or being flushed)"""
+        with self._lock:
+            return self._unflushed(user_id).get(topic_id, {"exp": 0, "minutes": 0})
+
+    def _unflushed(self, user_id: Optional[str]) -> Deltas:
+        """Call with _lock held"""
+        deltas = {}
+        for source in (self._pending, self._in_flight):
+            for (user, topic_id), delta in source.items():
+                if user == user_id:
+                    total = deltas.setdefault(topic_id, {"exp": 0, "minutes": 0})
+                    total["exp"] += delta["exp"]
+                    total["minutes"] += delta["minutes"]
+        return deltas
+
+    def read(self, read_stored: Callable[[], T], user_id: Optional[str] = None) -> Tuple[T, Deltas]:
+        """
+        Run read_stored() (a database read of the user's topics) and return its result with the
+        deltas that weren't in the database when it ran, for merge(). A flush moves deltas into the
+        database: a read around its commit could miss them or count them twice, so it's retried.
+        This is a seqlock on the user's commit counter (odd while a commit lands), no lock is held
+        during the read. After READ_ATTEMPTS tries the read waits for the flush lock instead.
+        read_stored() must query the database each time it's called (the session's identity map
+        would return the first result again, use populate_existing for ORM rows).
+        """
+        for _ in range(READ_ATTEMPTS):
+            with self._lock:
+                before = self._commits.get(user_id, 0)
+            if before % 2:
+                continue
+            stored = read_stored()
+            with self._lock:
+                if self._commits.get(user_id, 0) == before:
+                    return stored, self._unflushed(user_id)
+        with self._flush_lock:      # nothing is in flight now
+            stored = read_stored()
+            with self._lock:
+                return stored, self._unflushed(user_id)
+
+    def snapshot(self, topic_id: int, read_stored: Callable[[], int], user_id: Optional[str] = None) -> int:
+        """
+        A topic's stored + unflushed EXP. read_stored() reads the stored EXP through the caller's
+        session; it goes through read(), so no lock is held while it runs (except read()'s fallback).
+        """
+        stored, deltas = self.read(read_stored, user_id)
+        return stored + deltas.get(topic_id, {"exp": 0})["exp"]
+
+    def merge(self, item: dict, user_id: Optional[str] = None, deltas: Optional[Deltas] = None) -> dict:
+        """
+        Add unflushed deltas to a serialized topic. Exact with the deltas read() returned along with
+        the row; without them the current deltas are used, which a flush committing between the
+        row's read and this call can make come out short (e.g. rows of a long NDJSON stream).
+        """
+        if deltas is not None:
+            delta = deltas.get(item.get("id"), {"exp": 0, "minutes": 0})
+        else:
+            delta = self.pending(item.get("id"), user_id)
+        if not delta["exp"] and not delta["minutes"]:
+            return item
+        item = dict(item)
+        if "minutes_spent" in item:
+            item["minutes_spent"] += delta["minutes"]
+        if "status" in item and delta["minutes"] and item["status"] == "not_started":
+            item["status"] = "in_progress"
+        if "pokemon_exp" in item:
+            item["pokemon_exp"] += delta["exp"]
+            if "pokemon_level" in item:
+                level, _ = calculate_level_from_exp(item["pokemon_exp"], item.get("growth_rate"))
+                item["pokemon_level"] = max(item["pokemon_level"], level)
+        return item
+
+    def flush(self) -> List[Tuple[Optional[str], int]]:
+        """Write every buffered delta, one transaction per user; returns the (user id, topic id) pairs flushed"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._in_flight = dict(batch)       # still visible to reads until committed
+                self._pending_updates = 0
+            if not batch:
+                return []
+
+            by_user = defaultdict(dict)
+            for (user_id, topic_id), delta in batch.items():
+                by_user[user_id][topic_id] = delta
+
+            flushed, hydrate, failed = [], [], None
+            for user_id, deltas in by_user.items():
+                try:
+                    hydrate += self._flush_user(user_id, deltas)
+                    flushed += [(user_id, topic_id) for topic_id in deltas]
+                except Exception as e:
+                    # put the deltas back so the next flush retries them (other users' writes still go through)
+                    with self._lock:
+                        for topic_id, delta in deltas.items():
+                            self._in_flight.pop((user_id, topic_id), None)
+                            pending = self._pending.setdefault((user_id, topic_id), {"exp": 0, "minutes": 0})
+                            pending["exp"] += delta["exp"]
+                            pending["minutes"] += delta["minutes"]
+                    failed = failed or e
+
+            self.counters["flushes"] += 1
+            self.counters["topics_flushed"] += len(flushed)
+
+        for user_id, topic_id, pokemon_id in hydrate:
+            hydrate_topic_pokemon(topic_id, pokemon_id, user_id)
+        if failed is not None:
+            raise failed
+        return flushed
+
+    def _flush_user(self, user_id: Optional[str], deltas: Dict[int, Dict[str, int]]) -> list:
+        """One user's deltas in one transaction on their shard, returns the topics that need hydrating"""
+        hydrate = []
+        with open_session(user_id) as db:
+            db.connection().execute(
+                update(Topic)
+                .where(Topic.id == bindparam("topic_id"))
+                .values(
+                    pokemon_exp = Topic.pokemon_exp + bindparam("exp"),
+                    minutes_spent = Topic.minutes_spent + bindparam("minutes"),
+                    status = case(
+                        (and_(bindparam("minutes") > 0, Topic.status == "not_started"), "in_progress"),
+                        else_ = Topic.status,
+                    ),
+                ),
+                [{"topic_id": topic_id, **delta} for topic_id, delta in deltas.items()],
+            )
+
+            # one level/evolution pass per topic
+            topics = db.exec(select(Topic).where(Topic.id.in_(deltas.keys()), Topic.pokemon_id != None)).all()
+            for topic in topics:
+                old_level = topic.pokemon_level
+                evolution_data = apply_level_up(topic)
+                queue_level_events(db, topic, old_level, evolution_data)
+                if evolution_data and needs_hydration(topic):
+                    hydrate.append((user_id, topic.id, topic.pokemon_id))
+                db.add(topic)
+            publish_after_commit(db, "topic_progress", [
+                {"topic_id": topic_id, "exp_added": delta["exp"], "minutes_added": delta["minutes"]}
+                for topic_id, delta in deltas.items()
+            ])
+            with self._lock:
+                self._commits[user_id] = self._commits.get(user_id, 0) + 1     # odd: reads retry
+            committed = False
+            try:
+                db.commit()
+                committed = True
+            finally:
+                with self._lock:
+                    if committed:       # in the database now, no longer in flight
+                        for topic_id in deltas:
+                            self._in_flight.pop((user_id, topic_id), None)
+                    self._commits[user_id] += 1
+        return hydrate
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing EXP updates: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher thread"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target = self._run, name = "exp-accumulator", daemon = True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered (call on shutdown)"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+exp_accumulator = ExpAccumulator()
+
+# exp_accumulator.py batches high-frequency progress updates (POST /topics/{id}/add-exp)
+# into periodic atomic UPDATEs; main.py starts it on startup and flushes it on shutdown.
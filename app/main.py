@@ -1,34 +1,80 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
-from app.database import engine
+from app.database import engine, shard_router
+from app.migrations import ensure_schema
 from app.routers import topics
 from app.routers import sessions
 from app.routers import pokemon
+from app.routers import stats
+from app.routers import dashboard
+from app.routers import leaderboard
+from app.routers import archive
+from app.routers import admin
+from app.routers import events
+from app.routers import metrics
+from app.pokemon.pokemon_cache import pokemon_cache
+from app.pokemon.pokemon_client import pokemon_client
+from app.pokemon.pokemon_utils import warm_pokemon_cache
+from app.exp_accumulator import exp_accumulator
+from app.session_timer import session_timer
+from app.events import event_bus, watch_for_shutdown
+from app.response_cache import ResponseCacheMiddleware
+from app.metrics import MetricsMiddleware, instrument_engine, profiler
 
-app = FastAPI(title = "Study Progress Tracker") # creates a FastAPI application instance, app is a backend "app object"
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup
+    ensure_schema(engine)                   # DDL only when the schema version (PRAGMA user_version) changed
+    pokemon_cache.ready.clear()             # cache misses wait for the seed instead of going to PokéAPI
+    warming = asyncio.create_task(asyncio.to_thread(warm_pokemon_cache))   # seed + evolution table, off the boot path
+    exp_accumulator.start()                 # batched writes for /topics/{id}/add-exp
+    session_timer.start()                   # closes sessions whose heartbeats stopped
+    watch_for_shutdown()                    # open /events streams end on SIGTERM instead of blocking shutdown
+    if profiler is not None:
+        profiler.start()                    # STUDYMON_PROFILE_SLOW_MS is set: flame graphs for slow requests
+    yield
+    # shutdown
+    session_timer.stop()
+    exp_accumulator.stop()                  # writes any EXP still buffered
+    shard_router.close()                    # closes the open per-user database files
+    event_bus.close()                       # ends open /events streams
+    if profiler is not None:
+        profiler.stop()
+    await warming                           # a very short-lived worker may still be seeding
+    await pokemon_client.aclose()           # closes pooled PokéAPI connections
 
+app = FastAPI(title = "Study Progress Tracker", lifespan = lifespan) # creates a FastAPI application instance, app is a backend "app object"
+
+app.add_middleware(ResponseCacheMiddleware)  # cached topic/Pokémon reads with ETag/304 (inside CORS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins = ["*"],
     allow_credentials = True,
     allow_methods = ["*"],
     allow_headers = ["*"],
+    expose_headers = ["X-Next-Cursor", "ETag"], # lets the frontend read pagination cursors and ETags
 )
+app.add_middleware(MetricsMiddleware)       # per-route latency and SQL time for /metrics (outermost, times everything)
+instrument_engine(engine)                   # SQL statement timing via engine events
 
 app.include_router(topics.router)           # routers/topics is the group of routes (POST, GET, etc)
 app.include_router(sessions.router)
 app.include_router(pokemon.router)
-
-@app.on_event("startup")
-def on_startup():
-    SQLModel.metadata.create_all(engine)    # creates all the database tables, if not already existing
+app.include_router(stats.router)
+app.include_router(dashboard.router)
+app.include_router(leaderboard.router)
+app.include_router(archive.router)
+app.include_router(admin.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Study Tracker API"}
 
-# main.py creates the FastAPI app, sets up the database tables on startup,
+# main.py creates the FastAPI app, sets up the database tables on startup (lifespan),
 # and includes the routes defined in topics.py so the app can handle requests
 # like GET /topics and POST /topics.
 
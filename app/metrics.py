@@ -0,0 +1,274 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+# Latency buckets in seconds (Prometheus "le" bounds)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Opt-in sampling profiler: STUDYMON_PROFILE_SLOW_MS=200 dumps a flame graph of every request slower than 200 ms
+PROFILE_SLOW_MS = os.getenv("STUDYMON_PROFILE_SLOW_MS")
+PROFILE_DIR = Path(os.getenv("STUDYMON_PROFILE_DIR", "profiles"))
+PROFILE_INTERVAL_SECONDS = 0.005
+PROFILE_BUFFER_SECONDS = 60
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in the Prometheus text format"""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List] = {}   # labels -> [per-bucket counts..., overflow, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1     # first bucket with value <= le
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key, ('le', repr(float(bound))))} {cumulative}")
+            total = cumulative + series[-2]
+            lines.append(f"{self.name}_bucket{format_labels(key, ('le', '+Inf'))} {total}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{format_labels(key)} {total}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{format_labels(key)} {value:g}" for key, value in items)
+        return lines
+
+def render_gauges(name: str, help_text: str, values: Dict[Labels, float], kind: str = "gauge") -> List[str]:
+    """Values read at scrape time (e.g. cache counters kept by other modules)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{format_labels(key)} {value:g}" for key, value in sorted(values.items()))
+    return lines
+
+class RequestStats:
+    """Per-request accumulator, shared with the threadpool that runs sync routes through a ContextVar"""
+
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class Metrics:
+    """Everything /metrics reports that's recorded as it happens (the rest is read from counters at scrape time)"""
+
+    def __init__(self):
+        self.request_seconds = Histogram("studymon_http_request_duration_seconds",
+                                         "Request latency by route template, method and status", REQUEST_BUCKETS)
+        self.request_db_seconds = Histogram("studymon_http_request_db_seconds",
+                                            "Time spent in SQL per request", REQUEST_BUCKETS)
+        self.request_queries = Histogram("studymon_http_request_queries",
+                                         "SQL statements executed per request", COUNT_BUCKETS)
+        self.query_seconds = Histogram("studymon_db_query_duration_seconds",
+                                       "SQL statement latency by statement type", QUERY_BUCKETS)
+        self.pokeapi_seconds = Histogram("studymon_pokeapi_fetch_duration_seconds",
+                                         "Upstream Pokémon fetch latency by client and outcome", REQUEST_BUCKETS)
+        self.slow_profiles = Counter("studymon_slow_request_profiles_total", "Flame graphs written for slow requests")
+
+    def observe_pokeapi(self, client: str, started: float, ok: bool) -> None:
+        self.pokeapi_seconds.observe(time.perf_counter() - started, client=client, outcome="ok" if ok else "error")
+
+    def render(self) -> List[str]:
+        lines = []
+        for metric in (self.request_seconds, self.request_db_seconds, self.request_queries,
+                       self.query_seconds, self.pokeapi_seconds, self.slow_profiles):
+            lines.extend(metric.render())
+        return lines
+
+metrics = Metrics()
+
+def instrument_engine(db_engine) -> None:
+    """Time every SQL statement on an engine and charge it to the current request"""
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        metrics.query_seconds.observe(elapsed, statement=kind)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack at a fixed interval into a ring buffer.
+    Slow requests dump the samples taken while they ran as collapsed stacks
+    ("frame;frame;frame count" lines), the input format of flamegraph.pl and speedscope.
+    Samples come from all busy threads, so concurrent requests can show up in each other's profiles.
+    """
+
+    IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "base_events.py")
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS, buffer_seconds: float = PROFILE_BUFFER_SECONDS):
+        self.interval = interval
+        self._samples: "deque[Tuple[float, str]]" = deque(maxlen=int(buffer_seconds / interval))
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _stack(self, frame) -> Optional[str]:
+        if frame.f_code.co_filename.endswith(self.IDLE_FILES):
+            return None     # parked thread (idle worker, event loop waiting on select)
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopping.wait(self.interval):
+            now = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = self._stack(frame)
+                if stack is not None:
+                    self._samples.append((now, stack))
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self, start: float, end: float) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for taken, stack in list(self._samples):
+            if start <= taken <= end:
+                counts[stack] += 1
+        return counts
+
+    def dump(self, route: str, start: float, end: float, directory: Path = PROFILE_DIR) -> Optional[Path]:
+        counts = self.collapsed(start, end)
+        if not counts:
+            return None
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{int((end - start) * 1000)}ms-{slug}.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in counts.items()))
+        return path
+
+profiler = SamplingProfiler() if PROFILE_SLOW_MS else None
+
+def route_label(scope) -> str:
+    """Route template (/topics/{topic_id}) rather than the raw path, so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        # answered before routing (e.g. a response cache hit): find the route it would have gone to
+        for candidate in scope["app"].routes:
+            match, _ = candidate.matches(dict(scope))
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL count and SQL time for every HTTP request, by route template.
+    Plain ASGI (no BaseHTTPMiddleware), so it adds no per-request task or body buffering.
+    """
+
+    def __init__(self, app, slow_ms: Optional[float] = float(PROFILE_SLOW_MS) if PROFILE_SLOW_MS else None):
+        self.app = app
+        self.slow_seconds = slow_ms / 1000 if slow_ms is not None else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end = time.perf_counter()
+            current_request.reset(token)
+            route = route_label(scope)
+            metrics.request_seconds.observe(end - start, route=route, method=scope["method"], status=str(status["code"]))
+            metrics.request_db_seconds.observe(stats.query_seconds, route=route)
+            metrics.request_queries.observe(stats.queries, route=route)
+            if profiler is not None and self.slow_seconds is not None and end - start >= self.slow_seconds:
+                try:
+                    if profiler.dump(route, start, end) is not None:
+                        metrics.slow_profiles.inc(route=route)
+                except OSError as e:
+                    print(f"Error writing request profile: {e}")
+
+# metrics.py is the instrumentation layer: MetricsMiddleware and the engine hooks record
+# request/SQL/PokéAPI timings, routers/metrics.py renders them (plus cache counters)
+# for Prometheus at GET /metrics.
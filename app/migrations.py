@@ -0,0 +1,77 @@
+import zlib
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+from app.database import engine
+from app import models  # noqa: F401  (registers the tables on SQLModel.metadata)
+from app.rollups import ensure_daily_rollup
+
+# Columns added after the first release: (table, column, column definition).
+# create_all() only creates missing tables, so older database.db files get these via ALTER TABLE.
+ADDED_COLUMNS = [
+    ("topic", "growth_rate", "VARCHAR NOT NULL DEFAULT 'medium_fast'"),
+    ("studysession", "client_key", "VARCHAR"),
+]
+
+def run_migrations(db_engine = engine):
+    """Bring an existing database.db up to date with the models, without losing data"""
+    inspector = inspect(db_engine)
+    with db_engine.begin() as conn:
+        for table, column, definition in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+        # create_all() only builds indexes together with new tables, so add any that are missing
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst = True)
+
+def schema_version(metadata = SQLModel.metadata) -> int:
+    """
+    Fingerprint of every table, column and index the models define.
+    Changes whenever the models do, and fits in SQLite's 32-bit PRAGMA user_version.
+    """
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(table.name)
+        parts += [f"{column.name}:{column.type}:{column.nullable}" for column in table.columns]
+        parts += sorted(
+            f"{index.name}:{','.join(column.name for column in index.columns)}:{index.unique}"
+            for index in table.indexes
+        )
+    return zlib.crc32("|".join(parts).encode()) & 0x7FFFFFFF
+
+def ensure_schema(db_engine = engine) -> bool:
+    """
+    Create/upgrade the schema, unless the database says it's already at schema_version().
+    A worker booting against an up-to-date database.db does one PRAGMA read and no DDL.
+    Returns True if the DDL path ran.
+    """
+    version = schema_version()
+    is_sqlite = db_engine.url.get_backend_name() == "sqlite"
+    if is_sqlite:
+        with db_engine.connect() as conn:
+            if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+                return False
+
+    SQLModel.metadata.create_all(db_engine)     # creates all the database tables, if not already existing
+    run_migrations(db_engine)                   # adds columns/indexes that older database.db files are missing
+    ensure_daily_rollup(db_engine)              # builds daily totals for sessions from before the rollup existed
+
+    if is_sqlite:
+        with db_engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+    return True
+
+if __name__ == "__main__":
+    # python -m app.migrations  -> force the DDL path (e.g. after copying an old database.db in place)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA user_version = 0")
+    ensure_schema(engine)
+    print(f"Schema at version {schema_version()}")
+
+# migrations.py is the upgrade path for database.db files created by older versions.
+# ensure_schema() runs on startup; the DDL only happens when the stored schema version
+# (PRAGMA user_version) doesn't match the models.
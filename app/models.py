@@ -1,12 +1,19 @@
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import Index, text
+from datetime import datetime, date
 from typing import Optional, List
 
 class Topic(SQLModel, table = True): #sqlmodel variable allows Topic class to map to a database table automatically
+    __table_args__ = (
+        # leaderboards (routers/leaderboard.py): top-N walks these backwards, a rank is a range count
+        Index("ix_topic_pokemon_level_exp", "pokemon_level", "pokemon_exp"),
+        Index("ix_topic_pokemon_exp", "pokemon_exp"),
+        Index("ix_topic_minutes_spent", "minutes_spent"),
+    )
     id: Optional[int] = Field(default = None, primary_key = True) # think of id as a class with a default constructor = 0, but managed by the database
     title: str = Field(index = True)
     description: Optional[str] = None
-    status: str = Field(default = "not_started")
+    status: str = Field(default = "not_started", index = True)
     minutes_spent: int = Field(default = 0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -15,6 +22,7 @@ class Topic(SQLModel, table = True): #sqlmodel variable allows Topic class to ma
     pokemon_level: int = 1
     pokemon_exp: int = 0
     pokemon_sprite_url: Optional[str] = None
+    growth_rate: str = Field(default = "medium_fast") # leveling curve name, see pokemon/growth_curves.py
 
     sessions: List["StudySession"] = Relationship(back_populates="topic")
 # models.py defines the Topic class and its data (id, title, description, etc.).
@@ -23,11 +31,35 @@ class Topic(SQLModel, table = True): #sqlmodel variable allows Topic class to ma
 # id also serves as the primary key and main identifier for each Topic.
 
 class StudySession(SQLModel, table = True):
+    __table_args__ = (
+        # per-topic history and date ranges; also serves plain topic_id lookups
+        Index("ix_studysession_topic_id_start_time", "topic_id", "start_time"),
+        # open sessions only (end_time IS NULL), for the abandoned-session reaper; stays tiny
+        Index("ix_studysession_open", "start_time", sqlite_where = text("end_time IS NULL")),
+    )
     id: Optional[int] = Field(default = None, primary_key = True) # think of id as a class with a default constructor = 0, but managed by the database
     topic_id: int = Field(foreign_key = "topic.id")
-    start_time: datetime = Field(default_factory = datetime.utcnow)
+    start_time: datetime = Field(default_factory = datetime.utcnow, index = True)
     end_time: Optional[datetime] = None
     duration_minutes: int = Field(default = 0)
+    client_key: Optional[str] = Field(default = None, unique = True, index = True) # set by /sessions/bulk so retried uploads aren't counted twice
 
     topic: Optional[Topic] = Relationship(back_populates = "sessions")
 
+
+class CachedPokemon(SQLModel, table = True):
+    id: int = Field(primary_key = True) # Pokédex number, not auto-generated
+    name: str
+    sprite_url: Optional[str] = None
+    fetched_at: datetime = Field(default_factory = datetime.utcnow)
+# CachedPokemon is the persistent layer of the Pokémon cache (see pokemon/pokemon_cache.py),
+# so the server can answer Pokémon lookups without reaching PokéAPI.
+
+class DailyTopicMinutes(SQLModel, table = True):
+    __tablename__ = "daily_topic_minutes"
+    topic_id: int = Field(foreign_key = "topic.id", primary_key = True)
+    day: date = Field(primary_key = True, index = True) # UTC day the sessions started on
+    minutes: int = Field(default = 0)
+    session_count: int = Field(default = 0)
+# DailyTopicMinutes is a rollup of completed StudySessions per topic per day,
+# kept up to date by end_session/delete_session (see rollups.py), so stats read O(days) rows.
@@ -0,0 +1,134 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.database import engine
+
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500         # rows pulled from the database cursor at a time when streaming
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor holding the sort key of the last row on a page"""
+    raw = json.dumps(jsonable_encoder(list(values))).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def cursor_int(value) -> int:
+    if type(value) is not int or not -2**63 <= value < 2**63:     # SQLite integers are 64 bit
+        raise ValueError(f"not a row id: {value!r}")
+    return value
+
+def cursor_datetime(value) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:       # timestamps are stored as naive UTC
+        raise ValueError(f"not a naive timestamp: {value!r}")
+    return parsed
+
+def decode_cursor(cursor: str, *parsers: Callable) -> list:
+    """
+    The values of a cursor made by encode_cursor, one parser per value (e.g. cursor_datetime, cursor_int).
+    Anything that doesn't decode or parse is a 400, never a 500 from the query.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong number of values")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except Exception:
+        raise HTTPException(status_code = 400, detail = "Invalid cursor")
+
+def parse_fields(fields: Optional[str], model, schema: Optional[Type[BaseModel]] = None) -> Optional[List[str]]:
+    """
+    Turn ?fields=a,b into a list of column names, rejecting ones the model doesn't have
+    (or, with a response schema, ones the schema doesn't expose).
+    """
+    if not fields:
+        return None
+    allowed = schema.model_fields if schema is not None else model.__table__.columns
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code = 400, detail = f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def list_query(model, field_names: Optional[List[str]], key_names: Sequence[str]):
+    """
+    SELECT for a list endpoint: whole ORM rows, or only the requested columns
+    (plus the keyset columns, which cursors need even when they weren't asked for).
+    Returns (query, selected column names or None for whole rows).
+    """
+    if field_names is None:
+        return select(model), None
+    column_names = field_names + [name for name in key_names if name not in field_names]
+    return select(*(model.__table__.columns[name] for name in column_names)), column_names
+
+def row_to_dict(row, column_names: Optional[List[str]]) -> dict:
+    if column_names is None:
+        return row[0].model_dump()
+    return dict(zip(column_names, row))
+
+def project(item: dict, field_names: Optional[List[str]]) -> dict:
+    if field_names is None:
+        return item
+    return {name: item[name] for name in field_names}
+
+def response_fields(field_names: Optional[List[str]], schema: Optional[Type[BaseModel]]) -> Optional[List[str]]:
+    """
+    The fields a list response holds. These responses skip FastAPI's response_model, so a
+    response schema's fields are applied here, and columns it leaves out (e.g. client_key) don't leak.
+    """
+    if field_names is None and schema is not None:
+        return list(schema.model_fields)
+    return field_names
+
+def page_response(rows, column_names, field_names, limit: Optional[int], key_names: Sequence[str],
+                  transform: Optional[Callable[[dict], dict]] = None,
+                  schema: Optional[Type[BaseModel]] = None) -> JSONResponse:
+    """
+    Serialize one page of a limit+1 query result. If there's another page,
+    X-Next-Cursor holds the cursor to pass back as ?cursor=.
+    transform(item) can adjust each row before it's projected to the requested fields
+    (or, without ?fields=, to the fields of schema).
+    """
+    field_names = response_fields(field_names, schema)
+    items = [row_to_dict(row, column_names) for row in rows]
+    if transform is not None:
+        items = [transform(item) for item in items]
+    headers = {}
+    if limit is not None and len(items) > limit:
+        items = items[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(*(items[-1][name] for name in key_names))
+    return JSONResponse(jsonable_encoder([project(item, field_names) for item in items]), headers = headers)
+
+def ndjson_response(query, column_names, field_names, db_engine = engine,
+                    transform: Optional[Callable[[dict], dict]] = None,
+                    schema: Optional[Type[BaseModel]] = None) -> StreamingResponse:
+    """
+    Stream query results as newline-delimited JSON in bounded memory:
+    rows come off a server-side cursor in batches instead of being loaded with .all().
+    """
+    field_names = response_fields(field_names, schema)
+
+    def generate() -> Iterator[bytes]:
+        # own session: the request's session is closed before the body is streamed
+        with Session(db_engine) as db:
+            result = db.exec(query.execution_options(yield_per = STREAM_BATCH_SIZE))
+            for row in result:
+                item = row_to_dict(row, column_names)
+                if transform is not None:
+                    item = transform(item)
+                item = project(item, field_names)
+                yield (json.dumps(jsonable_encoder(item)) + "\n").encode()
+
+    return StreamingResponse(generate(), media_type = "application/x-ndjson")
+
+# pagination.py holds the shared pieces of the list endpoints:
+# keyset cursors, ?fields= projection and NDJSON streaming.
@@ -0,0 +1,118 @@
+from bisect import bisect_right
+from typing import Callable, Dict, List, Sequence
+
+MAX_LEVEL = 100
+
+def integer_cube_root(n: int) -> int:
+    """Largest x with x**3 <= n (exact, no float rounding errors)"""
+    if n <= 0:
+        return 0
+    x = int(round(n ** (1 / 3)))
+    while x ** 3 > n:
+        x -= 1
+    while (x + 1) ** 3 <= n:
+        x += 1
+    return x
+
+class GrowthCurve:
+    """
+    A leveling curve backed by a precomputed cumulative-EXP table.
+    table[level] is the total EXP needed to reach that level, so a level lookup is one bisect.
+    """
+
+    def __init__(self, name: str, formula: Callable[[int], int], max_level: int = MAX_LEVEL):
+        self.name = name
+        self.max_level = max_level
+        self.table = [0, 0] + [max(0, formula(level)) for level in range(2, max_level + 1)]
+
+    def exp_for_level(self, level: int) -> int:
+        """Total EXP needed to reach a given level (levels past max_level cost the same as max_level)"""
+        if level <= 1:
+            return 0
+        return self.table[min(level, self.max_level)]
+
+    def exp_to_next_level(self, level: int, exp: int) -> int:
+        """EXP still needed to reach level + 1; 0 at max_level, where there is no next level"""
+        if self.max_level is not None and level >= self.max_level:
+            return 0
+        return max(0, self.exp_for_level(level + 1) - exp)
+
+    def level_from_exp(self, exp: int) -> int:
+        """Highest level reached with this much total EXP - O(log max_level)"""
+        return max(1, bisect_right(self.table, exp) - 1)
+
+    def levels_from_exp(self, exps: Sequence[int]) -> List[int]:
+        """Batch version of level_from_exp, for recomputing many topics at once"""
+        table = self.table
+        return [max(1, bisect_right(table, exp) - 1) for exp in exps]
+
+class CubicGrowthCurve(GrowthCurve):
+    """
+    The original Studymon curve (level^3, no level cap).
+    Levels come straight from an integer cube root - O(1), however much EXP a topic has.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.max_level = None
+
+    def exp_for_level(self, level: int) -> int:
+        if level <= 1:
+            return 0
+        return level ** 3
+
+    def level_from_exp(self, exp: int) -> int:
+        return max(1, integer_cube_root(exp))
+
+    def levels_from_exp(self, exps: Sequence[int]) -> List[int]:
+        return [max(1, integer_cube_root(exp)) for exp in exps]
+
+def _erratic(n: int) -> int:
+    if n < 50:
+        return n ** 3 * (100 - n) // 50
+    if n < 68:
+        return n ** 3 * (150 - n) // 100
+    if n < 98:
+        return n ** 3 * ((1911 - 10 * n) // 3) // 500
+    return n ** 3 * (160 - n) // 100
+
+def _fluctuating(n: int) -> int:
+    if n < 15:
+        return n ** 3 * ((n + 1) // 3 + 24) // 50
+    if n < 36:
+        return n ** 3 * (n + 14) // 50
+    return n ** 3 * (n // 2 + 32) // 50
+
+# Growth rates from the main series games, keyed by the name stored in Topic.growth_rate
+GROWTH_CURVES: Dict[str, GrowthCurve] = {
+    "medium_fast": CubicGrowthCurve("medium_fast"),
+    "fast": GrowthCurve("fast", lambda n: 4 * n ** 3 // 5),
+    "medium_slow": GrowthCurve("medium_slow", lambda n: 6 * n ** 3 // 5 - 15 * n ** 2 + 100 * n - 140),
+    "slow": GrowthCurve("slow", lambda n: 5 * n ** 3 // 4),
+    "erratic": GrowthCurve("erratic", _erratic),
+    "fluctuating": GrowthCurve("fluctuating", _fluctuating),
+}
+
+DEFAULT_GROWTH_RATE = "medium_fast"
+
+def get_growth_curve(growth_rate: str = DEFAULT_GROWTH_RATE) -> GrowthCurve:
+    """Look up a growth curve by name, falling back to the default for unknown names"""
+    return GROWTH_CURVES.get(growth_rate or DEFAULT_GROWTH_RATE, GROWTH_CURVES[DEFAULT_GROWTH_RATE])
+
+def check_level_boundaries() -> None:
+    """Assertions on the edges of every curve: level 1, the last level before the cap and the cap itself"""
+    for name, curve in GROWTH_CURVES.items():
+        assert curve.level_from_exp(0) == 1 and curve.exp_to_next_level(1, 0) == curve.exp_for_level(2), name
+        if curve.max_level is None:
+            assert curve.exp_to_next_level(1000, curve.exp_for_level(1000)) > 0, name
+            continue
+        top, below = curve.max_level, curve.max_level - 1
+        assert curve.level_from_exp(curve.exp_for_level(top)) == top, name
+        assert curve.exp_to_next_level(below, curve.exp_for_level(below)) == curve.exp_for_level(top) - curve.exp_for_level(below), name
+        assert curve.exp_to_next_level(top, curve.exp_for_level(top)) == 0, name
+        assert curve.exp_to_next_level(top, curve.exp_for_level(top) * 2) == 0, name    # EXP keeps growing past the cap
+
+if __name__ == "__main__":
+    # python -m app.pokemon.growth_curves  -> fails if EXP-to-next-level is wrong at a level boundary
+    check_level_boundaries()
+    print(f"{len(GROWTH_CURVES)} growth curves OK")
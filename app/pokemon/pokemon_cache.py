@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlmodel import Session, select
+
+from ..database import engine
+from ..models import CachedPokemon
+from ..metrics import metrics
+
+POKEAPI_URL = "https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
+POKEAPI_TIMEOUT = 5                 # seconds, so a slow PokéAPI can't hang a request forever
+
+SEED_FILE = Path(__file__).with_name("pokemon_seed.json")  # Gen 1 + every EVOLUTION_DATA target
+
+MEMORY_MAX_ENTRIES = 512
+MEMORY_TTL_SECONDS = 24 * 60 * 60
+SEED_WAIT_SECONDS = 2               # a miss during the startup seed waits for it before going upstream
+
+Fetcher = Callable[[int], Optional[Dict]]
+
+def fetch_from_pokeapi(pokemon_id: int) -> Optional[Dict]:
+    """Fetch Pokémon data straight from PokéAPI (no caching)"""
+    import requests     # imported on first use: most processes never leave the cache, and it's ~60 ms to import
+    try:
+        response = requests.get(POKEAPI_URL.format(pokemon_id=pokemon_id), timeout=POKEAPI_TIMEOUT)
+        if response.status_code == 200:
+            data = response.json()
+            return {
+                "id": data["id"],
+                "name": data["name"].capitalize(),
+                "sprite_url": data["sprites"]["front_default"],
+            }
+    except Exception as e:
+        print(f"Error fetching Pokémon data: {e}")
+    return None
+
+class SqlPokemonStore:
+    """Persistent layer of the cache, kept in the pokemon cache table of database.db"""
+
+    def __init__(self, db_engine=engine):
+        self.engine = db_engine
+
+    def get(self, pokemon_id: int) -> Optional[Dict]:
+        with Session(self.engine) as db:
+            row = db.get(CachedPokemon, pokemon_id)
+            if row is None:
+                return None
+            return {"id": row.id, "name": row.name, "sprite_url": row.sprite_url}
+
+    def put(self, data: Dict) -> None:
+        with Session(self.engine) as db:
+            db.merge(CachedPokemon(
+                id=data["id"],
+                name=data["name"],
+                sprite_url=data["sprite_url"],
+                fetched_at=datetime.utcnow(),
+            ))
+            db.commit()
+
+    def seed(self, entries: list[Dict]) -> int:
+        """Insert any seed entries the store doesn't have yet, returns how many were added"""
+        with Session(self.engine) as db:
+            existing = set(db.exec(select(CachedPokemon.id)).all())   # one query, not one per entry
+            missing = [entry for entry in entries if entry["id"] not in existing]
+            db.add_all(CachedPokemon(**entry) for entry in missing)
+            db.commit()
+            return len(missing)
+
+class PokemonCache:
+    """
+    Layered Pokémon lookup: in-process LRU/TTL -> persistent store -> fetcher.
+    Only successful lookups are cached, so a PokéAPI outage doesn't poison the cache.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher = fetch_from_pokeapi,
+        store: Optional[SqlPokemonStore] = None,
+        max_entries: int = MEMORY_MAX_ENTRIES,
+        ttl_seconds: float = MEMORY_TTL_SECONDS,
+    ):
+        self.fetcher = fetcher
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[int, tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.ready = threading.Event()      # cleared while a background seed is running
+        self.ready.set()
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "store_hits": 0,
+            "fetches": 0,
+            "fetch_errors": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def set_fetcher(self, fetcher: Fetcher) -> None:
+        """Swap the upstream fetcher (e.g. a local stand-in for PokéAPI in tests)"""
+        self.fetcher = fetcher
+
+    def _remember(self, data: Dict) -> None:
+        with self._lock:
+            self._memory[data["id"]] = (time.monotonic() + self.ttl_seconds, data)
+            self._memory.move_to_end(data["id"])
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def lookup(self, pokemon_id: int) -> Optional[Dict]:
+        """Return cached data from memory or the store, without going upstream"""
+        data = self.lookup_memory(pokemon_id)
+        if data is not None:
+            return data
+        return self.lookup_store(pokemon_id)
+
+    def lookup_memory(self, pokemon_id: int) -> Optional[Dict]:
+        """The memory layer only: no I/O, safe to call on the event loop"""
+        with self._lock:
+            entry = self._memory.get(pokemon_id)
+            if entry is not None:
+                expires_at, data = entry
+                if expires_at > time.monotonic():
+                    self._memory.move_to_end(pokemon_id)
+                    self.counters["hits"] += 1
+                    return data
+                del self._memory[pokemon_id]
+                self.counters["expirations"] += 1
+            self.counters["misses"] += 1
+        return None
+
+    def lookup_store(self, pokemon_id: int) -> Optional[Dict]:
+        """The SQLite store (a blocking read; async callers run it in a thread), kept in memory if found"""
+        if self.store is not None:
+            data = self.store.get(pokemon_id)
+            if data is not None:
+                self.counters["store_hits"] += 1
+                self._remember(data)
+                return data
+        return None
+
+    def put(self, data: Dict) -> None:
+        """Add freshly fetched data to every layer"""
+        self._remember(data)
+        if self.store is not None:
+            try:
+                self.store.put(data)
+            except Exception as e:
+                print(f"Error saving Pokémon data to cache: {e}")
+
+    def get(self, pokemon_id: int) -> Optional[Dict]:
+        """Get Pokémon data, only calling the fetcher when no layer has it"""
+        data = self.lookup(pokemon_id)
+        if data is not None:
+            return data
+        if not self.ready.is_set() and self.ready.wait(SEED_WAIT_SECONDS):
+            data = self.lookup(pokemon_id)
+            if data is not None:
+                return data
+
+        self.counters["fetches"] += 1
+        started = time.perf_counter()
+        data = self.fetcher(pokemon_id)
+        metrics.observe_pokeapi("sync", started, data is not None)
+        if data is None:
+            self.counters["fetch_errors"] += 1
+            return None
+        self.put(data)
+        return data
+
+    def seed(self, path: Path = SEED_FILE) -> int:
+        """Load the offline seed file into the store and warm the memory layer"""
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        added = self.store.seed(entries) if self.store is not None else 0
+        for entry in entries[: self.max_entries]:
+            self._remember(entry)
+        return added
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self.counters, "size": len(self._memory), "max_entries": self.max_entries}
+
+pokemon_cache = PokemonCache(store=SqlPokemonStore())
+
+# pokemon_cache.py keeps Pokémon lookups off the network:
+# memory first, then the cachedpokemon table (pre-seeded from pokemon_seed.json),
+# and only then PokéAPI. Swap the fetcher with pokemon_cache.set_fetcher(...)
+# to run everything against a local stand-in.
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+from ..metrics import metrics
+from .pokemon_cache import POKEAPI_TIMEOUT, POKEAPI_URL, SEED_WAIT_SECONDS, PokemonCache, fetch_from_pokeapi, pokemon_cache
+
+MAX_CONNECTIONS = 20            # pooled keep-alive connections to PokéAPI
+MAX_CONCURRENT_FETCHES = 10     # upstream requests allowed in flight at once
+
+AsyncFetcher = Callable[[int], Awaitable[Optional[Dict]]]
+
+class AsyncPokemonClient:
+    """
+    asyncio client for Pokémon lookups, sitting in front of the same cache as fetch_pokemon_data.
+    - one pooled keep-alive httpx client per event loop
+    - per-request timeout and a cap on concurrent upstream fetches
+    - identical in-flight IDs share a single fetch (request coalescing)
+    """
+
+    def __init__(
+        self,
+        cache: PokemonCache = pokemon_cache,
+        max_concurrency: int = MAX_CONCURRENT_FETCHES,
+        timeout: float = POKEAPI_TIMEOUT,
+    ):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.fetcher: Optional[AsyncFetcher] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: Dict[int, asyncio.Task] = {}
+        self.counters = {"fetches": 0, "coalesced": 0}
+
+    def set_fetcher(self, fetcher: Optional[AsyncFetcher]) -> None:
+        """Swap the async upstream fetcher (None goes back to PokéAPI)"""
+        self.fetcher = fetcher
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx    # imported on first upstream fetch, keeps it out of worker startup
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def _fetch_from_pokeapi(self, pokemon_id: int) -> Optional[Dict]:
+        try:
+            response = await self._get_client().get(POKEAPI_URL.format(pokemon_id=pokemon_id))
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "id": data["id"],
+                    "name": data["name"].capitalize(),
+                    "sprite_url": data["sprites"]["front_default"],
+                }
+        except Exception as e:
+            print(f"Error fetching Pokémon data: {e}")
+        return None
+
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _fetch(self, pokemon_id: int) -> Optional[Dict]:
+        async with self._limit():
+            self.counters["fetches"] += 1
+            started = time.perf_counter()
+            if self.fetcher is not None:
+                data = await self.fetcher(pokemon_id)
+            elif self.cache.fetcher is not fetch_from_pokeapi:
+                # a sync stand-in was plugged into the cache, use it here too
+                data = await asyncio.to_thread(self.cache.fetcher, pokemon_id)
+            else:
+                data = await self._fetch_from_pokeapi(pokemon_id)
+            metrics.observe_pokeapi("async", started, data is not None)
+        if data is not None:
+            await asyncio.to_thread(self.cache.put, data)
+        return data
+
+    async def _lookup(self, pokemon_id: int) -> Optional[Dict]:
+        """The cache's memory layer inline, its SQLite store off the event loop"""
+        data = self.cache.lookup_memory(pokemon_id)
+        if data is not None:
+            return data
+        return await asyncio.to_thread(self.cache.lookup_store, pokemon_id)
+
+    async def get(self, pokemon_id: int) -> Optional[Dict]:
+        """Get Pokémon data from the cache, or fetch it (once per ID, however many callers wait)"""
+        data = await self._lookup(pokemon_id)
+        if data is not None:
+            return data
+        if not self.cache.ready.is_set() and await asyncio.to_thread(self.cache.ready.wait, SEED_WAIT_SECONDS):
+            data = await self._lookup(pokemon_id)
+            if data is not None:
+                return data
+
+        task = self._in_flight.get(pokemon_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(pokemon_id))
+            self._in_flight[pokemon_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(pokemon_id, None))
+        else:
+            self.counters["coalesced"] += 1
+        # shield so one cancelled caller doesn't cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    async def download(self, url: str) -> Optional[bytes]:
+        """Raw bytes of an upstream asset (e.g. a sprite), through the same pooled client and concurrency cap"""
+        async with self._limit():
+            started = time.perf_counter()
+            content = None
+            try:
+                response = await self._get_client().get(url)
+                if response.status_code == 200:
+                    content = response.content
+            except Exception as e:
+                print(f"Error downloading {url}: {e}")
+            metrics.observe_pokeapi("download", started, content is not None)
+            return content
+
+    async def get_many(self, pokemon_ids: List[int]) -> List[Optional[Dict]]:
+        """Fetch several Pokémon concurrently, results in the same order as pokemon_ids"""
+        return await asyncio.gather(*(self.get(pokemon_id) for pokemon_id in pokemon_ids))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+        self._in_flight.clear()
+
+pokemon_client = AsyncPokemonClient()
+
+# pokemon_client.py is the async counterpart of fetch_pokemon_data, used by the
+# async Pokémon routes. Both share pokemon_cache, so anything one of them fetched
+# is a cache hit for the other.
@@ -1,57 +1,38 @@
-import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Sequence
+from .pokemon_cache import pokemon_cache
+from .growth_curves import DEFAULT_GROWTH_RATE, get_growth_curve
 
 # EXP per minute of studying
 EXP_PER_MINUTE = 50
 
-# Simplified leveling curve (based on Pokémon Medium Fast growth rate)
-# Level requirements are reduced for faster progression
-def get_exp_for_level(level: int) -> int:
+# Leveling curves live in growth_curves.py. The default (medium_fast) is the
+# simplified Pokémon Medium Fast rate: level^3 total EXP, no level cap.
+def get_exp_for_level(level: int, growth_rate: str = DEFAULT_GROWTH_RATE) -> int:
     """Get total EXP needed to reach a given level"""
-    if level <= 1:
-        return 0
-    # Simplified formula: level^3 for faster leveling
-    return level ** 3
+    return get_growth_curve(growth_rate).exp_for_level(level)
 
-def calculate_level_from_exp(exp: int) -> tuple[int, int]:
+def calculate_level_from_exp(exp: int, growth_rate: str = DEFAULT_GROWTH_RATE) -> tuple[int, int]:
     """
     Calculate level and remaining EXP from total EXP
     Returns: (level, exp_in_current_level)
     """
-    level = 1
-    while get_exp_for_level(level + 1) <= exp:
-        level += 1
-    
-    exp_for_current_level = get_exp_for_level(level)
-    remaining_exp = exp - exp_for_current_level
+    curve = get_growth_curve(growth_rate)
+    level = curve.level_from_exp(exp)
+    remaining_exp = exp - curve.exp_for_level(level)
     
     return level, remaining_exp
 
-def get_exp_for_next_level(current_level: int, current_exp: int) -> int:
-    """Get how much EXP needed until next level"""
-    exp_for_next = get_exp_for_level(current_level + 1)
-    exp_for_current = get_exp_for_level(current_level)
-    needed = exp_for_next - exp_for_current
-    
-    # How much we already have toward next level
-    exp_in_level = current_exp - exp_for_current
-    
-    return needed - exp_in_level
+def calculate_levels_from_exp(exps: Sequence[int], growth_rate: str = DEFAULT_GROWTH_RATE) -> List[int]:
+    """Batch level calculation (leaderboards, recomputation jobs)"""
+    return get_growth_curve(growth_rate).levels_from_exp(exps)
+
+def get_exp_for_next_level(current_level: int, current_exp: int, growth_rate: str = DEFAULT_GROWTH_RATE) -> int:
+    """Get how much EXP needed until next level (0 at the curve's level cap)"""
+    return get_growth_curve(growth_rate).exp_to_next_level(current_level, current_exp)
 
 def fetch_pokemon_data(pokemon_id: int) -> Optional[Dict]:
-    """Fetch Pokémon data from PokéAPI"""
-    try:
-        response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}")
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "id": data["id"],
-                "name": data["name"].capitalize(),
-                "sprite_url": data["sprites"]["front_default"],
-            }
-    except Exception as e:
-        print(f"Error fetching Pokémon data: {e}")
-    return None
+    """Get Pokémon data, served from the local cache when possible (PokéAPI otherwise)"""
+    return pokemon_cache.get(pokemon_id)
 
 # Starter Pokémon IDs
 STARTER_POKEMON = {
@@ -142,24 +123,55 @@ EVOLUTION_DATA = {
     148: (149, 55),# Dragonair -> Dragonite at 55
 }
 
+# Precomputed evolution targets, filled by build_evolution_table() on startup
+# Format: {pokemon_id: {"evolves_to_id", "evolves_to_name", "evolves_to_sprite", "required_level"}}
+EVOLUTION_TABLE: Dict[int, Dict] = {}
+
+def set_evolution_target(pokemon_id: int, evolution_id: int, required_level: int, data: Optional[Dict]) -> None:
+    """Store one resolved evolution (data may be None if the target isn't cached yet)"""
+    EVOLUTION_TABLE[pokemon_id] = {
+        "evolves_to_id": evolution_id,
+        "evolves_to_name": data["name"] if data else None,
+        "evolves_to_sprite": data["sprite_url"] if data else None,
+        "required_level": required_level,
+    }
+
+def build_evolution_table() -> Dict[int, Dict]:
+    """
+    Resolve every EVOLUTION_DATA target from the Pokémon cache (never the network),
+    so check_evolution is a plain dictionary lookup.
+    """
+    for pokemon_id, (evolution_id, required_level) in EVOLUTION_DATA.items():
+        set_evolution_target(pokemon_id, evolution_id, required_level, pokemon_cache.lookup(evolution_id))
+    return EVOLUTION_TABLE
+
+def warm_pokemon_cache() -> None:
+    """
+    Seed the cache and resolve evolution targets (run in the background on startup).
+    Clear pokemon_cache.ready before scheduling this, so early misses wait for the seed.
+    """
+    try:
+        pokemon_cache.seed()            # offline Pokémon data, so lookups work without PokéAPI
+        build_evolution_table()         # evolution targets resolved once, not on every session end
+    except Exception as e:
+        print(f"Error warming Pokémon cache: {e}")
+    finally:
+        pokemon_cache.ready.set()
+
 def check_evolution(pokemon_id: int, current_level: int) -> Optional[Dict]:
     """
     Check if a Pokémon should evolve based on its level.
     Returns evolution data if ready to evolve, None otherwise.
+    Never does I/O: a target missing from the table comes back with
+    evolves_to_name/evolves_to_sprite set to None, for the caller to hydrate later.
     """
     if pokemon_id not in EVOLUTION_DATA:
         return None
     
     evolution_id, required_level = EVOLUTION_DATA[pokemon_id]
-    
-    if current_level >= required_level:
-        evolution_data = fetch_pokemon_data(evolution_id)
-        if evolution_data:
-            return {
-                "evolves_to_id": evolution_id,
-                "evolves_to_name": evolution_data["name"],
-                "evolves_to_sprite": evolution_data["sprite_url"],
-                "required_level": required_level
-            }
-    
-    return None
\ No newline at end of file
+    if current_level < required_level:
+        return None
+
+    if pokemon_id not in EVOLUTION_TABLE:
+        set_evolution_target(pokemon_id, evolution_id, required_level, None)
+    return dict(EVOLUTION_TABLE[pokemon_id])
@@ -0,0 +1,200 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .pokemon_client import AsyncPokemonClient, pokemon_client
+
+SPRITE_DIR = Path(os.getenv("STUDYMON_SPRITE_DIR", "sprites"))
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+SPRITE_SIZE = 96                    # PokéAPI front_default sprites are 96x96
+SHEET_COLUMNS = 16
+SHEETS = {"gen1": range(1, 152)}    # sheet name -> the Pokémon ids on it, in order
+
+SpriteFetcher = Callable[[str], Awaitable[Optional[bytes]]]
+CachedFile = Tuple[Path, str]       # (file, sha256 hex digest of its content)
+
+def render_sheet(sprites: Dict[int, bytes], pokemon_ids: Iterable[int],
+                 size: int = SPRITE_SIZE, columns: int = SHEET_COLUMNS) -> Tuple[bytes, Dict]:
+    """
+    One SVG holding every sprite (inlined PNGs) on a grid, plus its atlas.
+    Each sprite also gets a <view>, so <img src="gen1.svg#pokemon-25"> shows just Pikachu:
+    every <img> on the page shares the one download. A sprite's cell depends only on its
+    position in pokemon_ids, so a missing sprite leaves a gap instead of moving the others.
+    """
+    pokemon_ids = list(pokemon_ids)
+    width, height = columns * size, -(-len(pokemon_ids) // columns) * size
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        "<style>image{image-rendering:pixelated}</style>",
+    ]
+    cells = {}
+    for position, pokemon_id in enumerate(pokemon_ids):
+        if pokemon_id not in sprites:
+            continue
+        x, y = position % columns * size, position // columns * size
+        cells[str(pokemon_id)] = {"x": x, "y": y, "fragment": f"#pokemon-{pokemon_id}"}
+        parts.append(f'<view id="pokemon-{pokemon_id}" viewBox="{x} {y} {size} {size}"/>')
+        parts.append(f'<image x="{x}" y="{y}" width="{size}" height="{size}" '
+                     f'href="data:image/png;base64,{base64.b64encode(sprites[pokemon_id]).decode()}"/>')
+    parts.append("</svg>")
+    atlas = {"width": width, "height": height, "sprite_size": size, "sprites": cells}
+    return "\n".join(parts).encode(), atlas
+
+class SpriteCache:
+    """
+    Pokémon sprites on local disk, content addressed:
+    objects/ab/<sha256>.<ext> holds the bytes, refs/<name> holds the digest a name points at.
+    - the digest is computed once, when a file is stored, and doubles as its strong ETag
+    - stored files never change, so they're safe to serve with immutable cache headers
+    - writes are temp file + rename, a reader never sees half a sprite
+    - a missing sprite is downloaded once, concurrent requests for it wait on the same download
+    - only complete results are stored: a failed download or a sheet with gaps is retried next time
+    """
+
+    def __init__(self, directory: Path = SPRITE_DIR, client: AsyncPokemonClient = pokemon_client):
+        self.directory = Path(directory)
+        self.client = client
+        self.fetcher: Optional[SpriteFetcher] = None
+        self._refs: Dict[str, str] = {}     # name -> digest, read through from refs/
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.counters = {"hits": 0, "downloads": 0, "failures": 0, "coalesced": 0, "sheets_baked": 0}
+
+    def set_fetcher(self, fetcher: Optional[SpriteFetcher]) -> None:
+        """Swap the async sprite downloader, url -> PNG bytes (None goes back to the upstream URL)"""
+        self.fetcher = fetcher
+
+    def object_path(self, digest: str, extension: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest}.{extension}"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents = True, exist_ok = True)
+        fd, tmp = tempfile.mkstemp(dir = path.parent, prefix = ".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def store(self, name: str, data: bytes, extension: str) -> CachedFile:
+        """Save content under its digest (once, however many names point at it) and point name at it"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest, extension)
+        if not path.exists():
+            self._write(path, data)
+        self._write(self.directory / "refs" / name, digest.encode())
+        self._refs[name] = digest
+        return path, digest
+
+    def cached(self, name: str, extension: str) -> Optional[CachedFile]:
+        digest = self._refs.get(name)
+        if digest is None:
+            try:
+                digest = (self.directory / "refs" / name).read_text().strip()
+            except OSError:
+                return None
+        path = self.object_path(digest, extension)
+        if not path.exists():
+            return None
+        self._refs[name] = digest
+        return path, digest
+
+    async def get(self, pokemon_id: int) -> Optional[CachedFile]:
+        """A sprite from disk, downloaded first if this is the first time it's asked for"""
+        cached = self.cached(str(pokemon_id), "png")
+        if cached is not None:
+            self.counters["hits"] += 1
+            return cached
+        return await self._once(f"sprite-{pokemon_id}", lambda: self._download(pokemon_id))
+
+    async def _once(self, key: str, make: Callable[[], Awaitable]):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _download(self, pokemon_id: int) -> Optional[CachedFile]:
+        data = await self.client.get(pokemon_id)
+        url = data.get("sprite_url") if data else None
+        content = None
+        if url:
+            self.counters["downloads"] += 1
+            content = await (self.fetcher or self.client.download)(url)
+        if not content or not content.startswith(PNG_SIGNATURE):
+            self.counters["failures"] += 1
+            return None
+        return await asyncio.to_thread(self.store, str(pokemon_id), content, "png")
+
+    async def get_many(self, pokemon_ids: Iterable[int]) -> Dict[int, CachedFile]:
+        pokemon_ids = list(pokemon_ids)
+        results = await asyncio.gather(*(self.get(pokemon_id) for pokemon_id in pokemon_ids))
+        return {pokemon_id: cached for pokemon_id, cached in zip(pokemon_ids, results) if cached is not None}
+
+    async def sheet(self, name: str) -> Optional[Tuple[CachedFile, CachedFile]]:
+        """
+        (svg, atlas json) of a sheet in SHEETS, baked on first use.
+        None if a sprite couldn't be downloaded: nothing is stored then, the next call retries.
+        """
+        svg, atlas = self.cached(f"{name}.svg", "svg"), self.cached(f"{name}.json", "json")
+        if svg is not None and atlas is not None:
+            self.counters["hits"] += 1
+            return svg, atlas
+        return await self._once(f"sheet-{name}", lambda: self.bake(name))
+
+    async def bake(self, name: str) -> Optional[Tuple[CachedFile, CachedFile]]:
+        """Download any missing sprites of a sheet, render it and store it with its atlas"""
+        pokemon_ids = SHEETS[name]
+        files = await self.get_many(pokemon_ids)
+        if len(files) < len(pokemon_ids):
+            return None
+
+        def render() -> Tuple[CachedFile, CachedFile]:
+            sprites = {pokemon_id: path.read_bytes() for pokemon_id, (path, _) in files.items()}
+            svg_data, atlas = render_sheet(sprites, pokemon_ids)
+            svg = self.store(f"{name}.svg", svg_data, "svg")
+            atlas["sheet"] = f"/pokemon/sprites/{name}.svg"
+            atlas["etag"] = f'"{svg[1]}"'
+            return svg, self.store(f"{name}.json", json.dumps(atlas).encode(), "json")
+
+        baked = await asyncio.to_thread(render)
+        self.counters["sheets_baked"] += 1
+        return baked
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "in_flight": len(self._in_flight)}
+
+sprite_cache = SpriteCache()
+
+if __name__ == "__main__":
+    # python -m app.pokemon.sprite_cache  -> download every sheet's sprites and bake the sheets (e.g. at deploy time)
+    import time
+    from app.database import engine
+    from app.migrations import ensure_schema
+    from .pokemon_utils import warm_pokemon_cache
+
+    async def bake_all() -> List[str]:
+        try:
+            return [name for name in SHEETS if await sprite_cache.sheet(name) is not None]
+        finally:
+            await pokemon_client.aclose()
+
+    start = time.perf_counter()
+    ensure_schema(engine)
+    warm_pokemon_cache()    # sprite URLs come from the seeded Pokémon data, not from PokéAPI
+    baked = asyncio.run(bake_all())
+    print(f"Baked {len(baked)}/{len(SHEETS)} sprite sheets into {SPRITE_DIR} in {time.perf_counter() - start:.1f}s "
+          f"({sprite_cache.counters['downloads']} downloads, {sprite_cache.counters['failures']} failed)")
+
+# sprite_cache.py keeps Pokémon sprites (and pre-baked sprite sheets) on local disk,
+# so clients load them from the API (routers/pokemon.py) with long-lived caching
+# instead of from GitHub on every render.
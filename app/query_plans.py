@@ -0,0 +1,88 @@
+import sys
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+from sqlmodel import SQLModel, Session, create_engine, select, func, or_, and_
+
+from app import models  # noqa: F401  (registers the tables on SQLModel.metadata)
+from app.migrations import run_migrations
+from app.models import DailyTopicMinutes, StudySession, Topic
+from app.pagination import list_query
+from app.routers.leaderboard import rank_query, top_topics_query, week_rank_query
+from app.session_timer import stale_candidates_query
+from app.routers.stats import completed_sessions, local_day, rollup_in_range, topic_stats_query
+
+SOME_DAY = date(2024, 1, 1)
+SOME_TIME = datetime(2024, 1, 1, 12, 0)
+
+def router_queries() -> Dict[str, object]:
+    """The filtered/paged queries the routers run, built the same way the routes build them"""
+    topics, _ = list_query(Topic, None, ["id"])
+    sessions, _ = list_query(StudySession, None, ["start_time", "id"])
+    newest_first = (StudySession.start_time.desc(), StudySession.id.desc())
+    after_cursor = or_(
+        StudySession.start_time < SOME_TIME,
+        and_(StudySession.start_time == SOME_TIME, StudySession.id < 100),
+    )
+    day = local_day(60)
+
+    return {
+        "list_topics?status": topics.where(Topic.status == "in_progress").order_by(Topic.id),
+        "list_topics?cursor": topics.where(Topic.id > 10).order_by(Topic.id).limit(51),
+        "get_sessions?topic_id": sessions.where(StudySession.topic_id == 1).order_by(*newest_first),
+        "get_sessions?cursor": sessions.where(after_cursor).order_by(*newest_first).limit(51),
+        "get_sessions?topic_id&cursor": sessions.where(StudySession.topic_id == 1, after_cursor).order_by(*newest_first).limit(51),
+        "stats/topics?start&end": topic_stats_query(SOME_DAY, SOME_DAY),
+        "stats/summary?start&end": rollup_in_range(select(func.sum(DailyTopicMinutes.minutes)), SOME_DAY, SOME_DAY),
+        "stats/daily?start&end": rollup_in_range(
+            select(DailyTopicMinutes.day, func.sum(DailyTopicMinutes.minutes)).group_by(DailyTopicMinutes.day),
+            SOME_DAY, SOME_DAY,
+        ),
+        "stats/daily?start&tz_offset_minutes": completed_sessions(
+            select(day, func.sum(StudySession.duration_minutes)).group_by(day), SOME_DAY, None, 60,
+        ),
+        "stats/streaks": select(DailyTopicMinutes.day).distinct().order_by(DailyTopicMinutes.day),
+        "stats/status": select(Topic.status, func.count()).group_by(Topic.status),
+        "leaderboard/level": top_topics_query("level", 10),
+        "leaderboard/exp": top_topics_query("exp", 10),
+        "leaderboard/minutes": top_topics_query("minutes", 10),
+        "leaderboard/level/topics/{id}": rank_query("level", [5, 200]),
+        "leaderboard/exp/topics/{id}": rank_query("exp", [200]),
+        "leaderboard/minutes/topics/{id}": rank_query("minutes", [60]),
+        "leaderboard/week/topics/{id}": week_rank_query(60),
+        "session reaper": stale_candidates_query(SOME_TIME, (SOME_TIME, 100), 500),
+    }
+
+def full_scans(db: Session, query) -> List[str]:
+    """EXPLAIN QUERY PLAN steps that read a whole table instead of going through an index"""
+    compiled = query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    plan = db.exec(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    # reading back a subquery's result (e.g. a GROUP BY) is a scan of that result, not of a table
+    subqueries = {row.detail.split()[-1] for row in plan if row.detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    return [
+        row.detail for row in plan
+        if row.detail.startswith("SCAN ") and " USING " not in row.detail
+        and row.detail.split()[1] not in subqueries
+    ]
+
+def check_query_plans(db_engine = None) -> Dict[str, List[str]]:
+    """Run every router query through EXPLAIN QUERY PLAN, returns {query name: full table scans}"""
+    if db_engine is None:
+        db_engine = create_engine("sqlite://")      # fresh in-memory schema
+        SQLModel.metadata.create_all(db_engine)
+        run_migrations(db_engine)
+    with Session(db_engine) as db:
+        return {name: full_scans(db, query) for name, query in router_queries().items()}
+
+if __name__ == "__main__":
+    # python -m app.query_plans  -> fails if any router query falls back to a full table scan
+    failures = {name: scans for name, scans in check_query_plans().items() if scans}
+    for name, scans in failures.items():
+        print(f"FULL SCAN  {name}: {'; '.join(scans)}")
+    print(f"{len(failures)} of {len(router_queries())} queries do a full table scan")
+    sys.exit(1 if failures else 0)
+
+# query_plans.py is the regression check for the indexes in models.py:
+# any router query that stops using an index shows up as a full table scan.
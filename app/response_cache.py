@@ -0,0 +1,181 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+from sqlmodel import Session
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.auth import AUTH_HEADER
+from app.database import DATABASE_URL
+
+MAX_CACHED_RESPONSES = 512
+POKEMON_CACHE_CONTROL = "public, max-age=604800, immutable"    # Pokémon data never changes
+VERSIONED_CACHE_CONTROL = "no-cache"                            # always revalidate, usually a cheap 304
+
+# GET routes whose responses are cached: "versioned" ones change with topic/session writes,
+# "immutable" ones never change (random encounters are deliberately not listed)
+CACHED_ROUTES = [
+    (re.compile(r"^/topics/$"), "versioned"),
+    (re.compile(r"^/topics/\d+$"), "versioned"),
+    (re.compile(r"^/dashboard$"), "versioned"),
+    (re.compile(r"^/leaderboard/(level|exp|minutes)(/topics/\d+)?$"), "versioned"),   # not /week: it moves at midnight
+    (re.compile(r"^/pokemon/starters$"), "immutable"),
+    (re.compile(r"^/pokemon/\d+$"), "immutable"),
+    (re.compile(r"^/topics/starters/list$"), "immutable"),
+]
+
+def default_version_file() -> Path:
+    """Marker file next to the database, so every worker process sees the same data version"""
+    if DATABASE_URL.startswith("sqlite:///") and DATABASE_URL != "sqlite:///:memory:":
+        return Path(DATABASE_URL[len("sqlite:///"):] + ".version")
+    return Path(os.getenv("STUDYMON_VERSION_FILE", "database.version"))
+
+class DataVersion:
+    """
+    Version of the topic/session data, bumped on every write.
+    Stored as the mtime of a marker file: reading it is a stat() call, not a database query,
+    and it's shared by all uvicorn workers using the same database file.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or default_version_file()
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        with self._lock:
+            now = max(time.time_ns(), self._last + 1)
+            self._last = now
+            try:
+                self.path.touch(exist_ok = True)
+                os.utime(self.path, ns = (now, now))
+            except OSError as e:
+                print(f"Error bumping data version: {e}")
+
+    def current(self) -> int:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.bump()
+            return self.path.stat().st_mtime_ns
+
+data_version = DataVersion()
+cache_counters = {"hits": 0, "misses": 0, "not_modified": 0}  # shared by every middleware instance, read by /metrics
+
+@event.listens_for(Session, "after_commit")
+def bump_on_commit(session):
+    # every committed transaction is a write (reads never commit), so invalidate cached reads
+    data_version.bump()
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+    Conditional GET check on If-None-Match only. There's no Last-Modified / If-Modified-Since:
+    versioned data changes many times a second, so a whole-second date would call stale data fresh.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Server-side cache for the read routes in CACHED_ROUTES, with ETags.
+    Versioned entries are keyed on the data version, so a write makes them stale without
+    any explicit invalidation; a client sending the current ETag gets a 304 with no DB hit.
+    """
+
+    def __init__(self, app, max_entries: int = MAX_CACHED_RESPONSES):
+        super().__init__(app)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[int, dict[str, str], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = cache_counters
+
+    async def __call__(self, scope, receive, send):
+        # everything that isn't a cached route (e.g. long-lived /events streams) skips
+        # BaseHTTPMiddleware's per-request task group and body buffering entirely
+        if scope["type"] != "http" or self._kind(Request(scope)) is None:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+    def _kind(self, request: Request) -> Optional[str]:
+        if request.method != "GET" or request.query_params.get("stream") in ("true", "1"):
+            return None
+        for pattern, kind in CACHED_ROUTES:
+            if pattern.match(request.url.path):
+                return kind
+        return None
+
+    async def dispatch(self, request: Request, call_next):
+        kind = self._kind(request)
+        if kind is None:
+            return await call_next(request)
+
+        # topic data differs per user (shard), Pokémon data doesn't. A token belongs to exactly one
+        # user, so entries are keyed by it: only a request with a valid token ever fills one
+        credential = request.headers.get(AUTH_HEADER, "") if kind == "versioned" else ""
+        key = credential + ":" + str(request.url.path) + "?" + str(request.url.query)
+        version = data_version.current() if kind == "versioned" else 0
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+            else:
+                entry = None
+
+        if entry is not None:
+            _, headers, body = entry
+            if not_modified(request, headers["etag"]):
+                self.counters["not_modified"] += 1
+                return Response(status_code = 304, headers = headers)
+            self.counters["hits"] += 1
+            return Response(content = body, media_type = "application/json", headers = headers)
+
+        self.counters["misses"] += 1
+        response = await call_next(request)
+        if response.status_code != 200 or response.headers.get("content-type") != "application/json":
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if kind == "immutable" and (body == b"[]" or body.startswith(b'{"error"')):
+            # a failed Pokémon lookup (still a 200 for the frontend) shouldn't be cached for good
+            return Response(content = body, media_type = "application/json", headers = {"cache-control": "no-store"})
+        if kind == "versioned":
+            headers = {
+                "etag": f'"v{version}-{hashlib.sha1(key.encode()).hexdigest()[:12]}"',
+                "cache-control": VERSIONED_CACHE_CONTROL,
+                "vary": AUTH_HEADER,
+            }
+        else:
+            headers = {
+                "etag": f'"{hashlib.sha1(body).hexdigest()}"',
+                "cache-control": POKEMON_CACHE_CONTROL,
+            }
+        # keep headers the route set itself (e.g. X-Next-Cursor)
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type") and name not in headers:
+                headers[name] = value
+
+        with self._lock:
+            self._entries[key] = (version, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last = False)
+
+        if not_modified(request, headers["etag"]):
+            return Response(status_code = 304, headers = headers)
+        return Response(content = body, status_code = 200, media_type = "application/json", headers = headers)
+
+# response_cache.py caches GET /topics/, /topics/{id}, /dashboard and the fixed /pokemon/* reads.
+# Topic data is versioned by data_version (bumped after every commit and every buffered
+# add-exp), Pokémon data is cached for good and sent with long-lived Cache-Control headers.
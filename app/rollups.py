@@ -0,0 +1,64 @@
+from typing import Dict, List
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import DailyTopicMinutes, StudySession
+
+def add_to_daily_rollup(db: Session, rows: List[Dict]) -> None:
+    """
+    Upsert {topic_id, day, minutes, session_count} deltas into daily_topic_minutes in one executemany.
+    Runs inside the caller's transaction, so the rollup commits together with the sessions.
+    """
+    if not rows:
+        return
+    statement = sqlite_insert(DailyTopicMinutes)
+    statement = statement.on_conflict_do_update(
+        index_elements = [DailyTopicMinutes.topic_id, DailyTopicMinutes.day],
+        set_ = {
+            "minutes": DailyTopicMinutes.minutes + statement.excluded.minutes,
+            "session_count": DailyTopicMinutes.session_count + statement.excluded.session_count,
+        },
+    )
+    db.connection().execute(statement, rows)
+
+def apply_session_to_rollup(db: Session, study_session: StudySession, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one completed session from daily_topic_minutes"""
+    add_to_daily_rollup(db, [{
+        "topic_id": study_session.topic_id,
+        "day": study_session.start_time.date(),
+        "minutes": sign * study_session.duration_minutes,
+        "session_count": sign,
+    }])
+
+    if sign < 0:    # drop days that no longer have any sessions
+        db.exec(delete(DailyTopicMinutes).where(DailyTopicMinutes.session_count <= 0))
+
+def rebuild_daily_rollup(db: Session) -> int:
+    """Recompute daily_topic_minutes from the raw sessions, returns the number of rollup rows"""
+    day = func.date(StudySession.start_time)
+    db.exec(delete(DailyTopicMinutes))
+    db.exec(insert(DailyTopicMinutes).from_select(
+        ["topic_id", "day", "minutes", "session_count"],
+        select(StudySession.topic_id, day, func.sum(StudySession.duration_minutes), func.count())
+        .where(StudySession.end_time != None)
+        .group_by(StudySession.topic_id, day),
+    ))
+    db.commit()
+    return db.exec(select(func.count()).select_from(DailyTopicMinutes)).one()
+
+def ensure_daily_rollup(db_engine = engine) -> None:
+    """Build the rollup once for databases that have sessions from before it existed"""
+    with Session(db_engine) as db:
+        has_rollup = db.exec(select(DailyTopicMinutes.topic_id).limit(1)).first() is not None
+        has_sessions = db.exec(select(StudySession.id).where(StudySession.end_time != None).limit(1)).first() is not None
+        if has_sessions and not has_rollup:
+            rebuild_daily_rollup(db)
+
+if __name__ == "__main__":
+    # python -m app.rollups  -> rebuild the rollup from scratch
+    with Session(engine) as db:
+        print(f"Rebuilt daily_topic_minutes: {rebuild_daily_rollup(db)} rows")
+
+# rollups.py maintains daily_topic_minutes (per-topic, per-day study totals),
+# which the /stats routes read instead of scanning every StudySession.
@@ -0,0 +1,60 @@
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlmodel import Session, select, func
+from ..auth import AUTH_SECRET, issue_token
+from ..database import ShardRouter, shard_router
+from ..models import StudySession, Topic
+
+ADMIN_TOKEN = os.getenv("STUDYMON_ADMIN_TOKEN")        # /admin needs a matching X-Admin-Token header, unset = /admin is off
+FANOUT_WORKERS = int(os.getenv("STUDYMON_ADMIN_WORKERS", "8"))  # shards scanned at the same time
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Fails closed: without a configured token the admin endpoints don't exist"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+def shard_totals(user_id: Optional[str], router: ShardRouter = shard_router) -> dict:
+    """Counts for one shard (None = the default database), two index/table scans on its own connection"""
+    with router.borrow(user_id) as db_engine, Session(db_engine) as db:
+        topics, minutes = db.exec(select(func.count(), func.coalesce(func.sum(Topic.minutes_spent), 0))).one()
+        sessions = db.exec(select(func.count()).select_from(StudySession)).one()
+    return {"user_id": user_id, "topics": topics, "sessions": sessions, "minutes": minutes}
+
+@router.get("/shards")
+def get_shard_totals(include_default: bool = True):
+    """
+    Topic, session and minute totals for every user's shard, plus the grand total.
+    Shards are separate files, so they're scanned in parallel (FANOUT_WORKERS at a time):
+    sqlite3 releases the GIL while a query runs, so the wall time is about the slowest shard's, not the sum.
+    """
+    users = ([None] if include_default else []) + shard_router.users()
+    with ThreadPoolExecutor(max_workers=FANOUT_WORKERS) as pool:
+        shards = list(pool.map(shard_totals, users))
+    totals = {name: sum(shard[name] for shard in shards) for name in ("topics", "sessions", "minutes")}
+    return {"shard_count": len(shards), "totals": totals, "shards": shards, "router": shard_router.stats()}
+
+@router.post("/users/{user_id}", status_code=201)
+def provision_user(user_id: str, response: Response):
+    """
+    Create a user's shard and return their API token, sent as "Authorization: Bearer <token>".
+    This is the only way a shard is created. For an existing user the token is returned again (200).
+    """
+    if not AUTH_SECRET:
+        raise HTTPException(status_code=503, detail="User accounts are disabled: set STUDYMON_AUTH_SECRET")
+    try:
+        created = shard_router.create(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not created:
+        response.status_code = 200
+    return {"user_id": user_id, "token": issue_token(user_id), "created": created}
+
+# admin.py holds user provisioning and the cross-user (cross-shard) reads: one query per
+# shard file, fanned out over a thread pool and summed here, since SQLite can't join across files.
@@ -0,0 +1,47 @@
+import tempfile
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from ..database import shard_router, user_from_request
+from ..archive import MEDIA_TYPE, ArchiveError, DatabaseNotEmpty, export_archive, import_archive
+
+router = APIRouter(prefix="/archive", tags=["Archive"])
+
+SPOOL_MAX_BYTES = 16 * 1024 * 1024      # uploads bigger than this are spooled to a temp file, not held in memory
+
+@router.get("/export")
+def export_history(request: Request):
+    """
+    Download every topic and session (of the token's user) as one compressed archive (see app/archive.py),
+    streamed chunk by chunk. Restore it with POST /archive/import or `python -m app.archive import`.
+    """
+    db_engine = shard_router.engine_for(user_from_request(request))
+    filename = f"studymon-{datetime.utcnow():%Y%m%d-%H%M%S}.archive"
+    return StreamingResponse(export_archive(db_engine), media_type=MEDIA_TYPE,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.post("/import")
+async def import_history(request: Request):
+    """
+    Restore an archive sent as the raw request body into an empty database (ids are kept as exported).
+    The body is spooled to disk as it arrives, then bulk inserted chunk by chunk in one transaction.
+    With a user token the archive goes into that user's (provisioned, still empty) shard,
+    e.g. to move a user off the shared database.
+    """
+    user_id = user_from_request(request)
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            db_engine = await run_in_threadpool(shard_router.engine_for, user_id)
+            counts = await run_in_threadpool(import_archive, upload, db_engine)
+        except DatabaseNotEmpty as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ArchiveError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return {"imported": counts}
+
+# archive.py exposes the binary history export/import (app/archive.py) over HTTP,
+# for backups and for moving a history to another server.
@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select, func
+from ..database import get_session, user_of
+from ..models import StudySession, Topic, DailyTopicMinutes
+from ..exp_accumulator import exp_accumulator
+from ..pokemon.pokemon_utils import get_exp_for_level, get_exp_for_next_level
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+TOPIC_SUMMARY_FIELDS = [
+    "id", "title", "status", "minutes_spent", "growth_rate",
+    "pokemon_id", "pokemon_name", "pokemon_level", "pokemon_exp", "pokemon_sprite_url",
+]
+
+def topic_summary(item: dict, user_id: Optional[str] = None, deltas: Optional[dict] = None) -> dict:
+    """A topic with its EXP progress towards the next level (deltas: from ExpAccumulator.read)"""
+    item = exp_accumulator.merge(item, user_id, deltas)
+    if item["pokemon_id"]:
+        level, exp, growth_rate = item["pokemon_level"], item["pokemon_exp"], item["growth_rate"]
+        item["exp_for_current_level"] = get_exp_for_level(level, growth_rate)
+        item["exp_for_next_level"] = get_exp_for_level(level + 1, growth_rate)
+        item["exp_to_next_level"] = get_exp_for_next_level(level, exp, growth_rate)
+    return item
+
+@router.get("")
+def get_dashboard(recent: int = Query(default=10, ge=0, le=100), db: Session = Depends(get_session)):
+    """
+    Everything the app shows on load, in one response and three queries:
+    topic summaries (plus the ace Pokémon), the most recent sessions and study totals.
+    The Topic.sessions relationship is never touched, so there's no N+1.
+    """
+    # 1. topic summaries, only the columns the UI uses
+    columns = [getattr(Topic, name) for name in TOPIC_SUMMARY_FIELDS]
+    rows, deltas = exp_accumulator.read(lambda: db.exec(select(*columns).order_by(Topic.id)).all(), user_of(db))
+    topics = [topic_summary(dict(row._mapping), user_of(db), deltas) for row in rows]
+    titles = {topic["id"]: topic["title"] for topic in topics}
+
+    # ace = highest level, ties broken by EXP (same rule as the old frontend code)
+    with_pokemon = [topic for topic in topics if topic["pokemon_id"]]
+    ace = max(with_pokemon, key=lambda topic: (topic["pokemon_level"], topic["pokemon_exp"]), default=None)
+
+    # 2. most recent sessions, titles joined from the topics we already have
+    recent_sessions = [
+        {**session.model_dump(exclude={"client_key"}), "topic_title": titles.get(session.topic_id)}
+        for session in db.exec(
+            select(StudySession).order_by(StudySession.start_time.desc(), StudySession.id.desc()).limit(recent)
+        ).all()
+    ]
+
+    # 3. totals from the daily rollup
+    total_minutes, total_sessions = db.exec(select(
+        func.coalesce(func.sum(DailyTopicMinutes.minutes), 0),
+        func.coalesce(func.sum(DailyTopicMinutes.session_count), 0),
+    )).one()
+
+    return {
+        "topics": topics,
+        "ace": ace,
+        "recent_sessions": recent_sessions,
+        "totals": {
+            "topics": len(topics),
+            "minutes": total_minutes,
+            "sessions": total_sessions,
+            "average_session_minutes": round(total_minutes / total_sessions) if total_sessions else 0,
+        },
+    }
+
+# dashboard.py replaces the frontend's request fan-out on page load
+# (several GET /topics/ plus GET /sessions/) with a single GET /dashboard.
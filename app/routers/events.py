@@ -0,0 +1,70 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from ..database import user_from_request
+from ..events import Subscriber, event_bus, encode_frame, shutting_down
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+RETRY_MILLISECONDS = 3000       # how long EventSource waits before reconnecting
+POLL_SECONDS = 5.0              # an idle stream checks this often whether the client left or the server is stopping
+EVENT_TYPES = {
+    "topic_created", "topic_updated", "topic_deleted", "topic_progress",
+    "session_started", "session_ended", "sessions_uploaded", "session_deleted",
+    "level_up", "evolution",
+}
+
+async def event_stream(subscriber: Subscriber, request: Request) -> AsyncIterator[bytes]:
+    """
+    SSE body for one subscriber, unsubscribes when the client goes away.
+    Ends by itself once the server is stopping, so open streams never hold up a graceful shutdown.
+    """
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+        while not shutting_down.is_set():
+            # keepalives come from the bus; the timeout is a backstop, on SIGTERM the bus wakes every stream at once
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                continue
+            if frame is None:       # event_bus.close()
+                return
+            if subscriber.dropped > subscriber.reported:
+                # this client fell behind and missed events, it should refetch (e.g. GET /dashboard)
+                yield encode_frame(None, "lagged", {"missed": subscriber.dropped - subscriber.reported})
+                subscriber.reported = subscriber.dropped
+            yield frame
+    finally:
+        event_bus.unsubscribe(subscriber)
+
+@router.get("")
+async def stream_events(request: Request, types: Optional[str] = None):
+    """
+    Server-Sent Events stream of topic/session changes, so clients subscribe once instead of polling.
+    - types: comma separated event types to receive, e.g. ?types=level_up,evolution (default: all)
+    Every event's data is JSON. A "lagged" event means the client missed some and should refetch.
+    Only changes to the requesting user's data (bearer token) are streamed.
+    """
+    wanted = None
+    if types:
+        wanted = {name.strip() for name in types.split(",") if name.strip()}
+        unknown = wanted - EVENT_TYPES
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown event types: {', '.join(sorted(unknown))}")
+
+    subscriber = event_bus.subscribe(wanted, user_from_request(request))
+    if subscriber is None:
+        raise HTTPException(status_code=503, detail="Too many open event streams")
+    return StreamingResponse(
+        event_stream(subscriber, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+def get_event_stats():
+    """Open streams and published/delivered/dropped event counters"""
+    return event_bus.stats()
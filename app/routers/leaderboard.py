@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select, func, or_, and_
+from ..database import get_session, user_of
+from ..models import Topic, DailyTopicMinutes
+from ..exp_accumulator import exp_accumulator
+from .dashboard import TOPIC_SUMMARY_FIELDS, topic_summary
+from .stats import rollup_in_range, topic_stats_query
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+# Rankings are read straight off indexes (see Topic.__table_args__), which SQLite keeps
+# sorted on every write, so top-N is an index walk of N rows and a rank is a range count.
+# Boards read committed values: EXP still buffered by exp_accumulator counts after its next flush.
+
+# board -> sort key columns, highest first; "level" is the ace rule (level, then EXP)
+TOPIC_BOARDS = {
+    "level": (Topic.pokemon_level, Topic.pokemon_exp),
+    "exp": (Topic.pokemon_exp,),
+    "minutes": (Topic.minutes_spent,),
+}
+POKEMON_BOARDS = {"level", "exp"}       # only topics that have a Pokémon
+WEEK_DAYS = 7                           # "week" board: minutes from the daily rollup, today (UTC) and the 6 days before
+
+def board_columns(board: str):
+    if board not in TOPIC_BOARDS:
+        raise HTTPException(status_code=404, detail=f"Unknown leaderboard: {board}")
+    return TOPIC_BOARDS[board]
+
+def board_filter(board: str):
+    return [Topic.pokemon_id != None] if board in POKEMON_BOARDS else []
+
+def week_start():
+    return datetime.utcnow().date() - timedelta(days=WEEK_DAYS - 1)
+
+def top_topics_query(board: str, limit: int):
+    columns = [getattr(Topic, name) for name in TOPIC_SUMMARY_FIELDS]
+    keys = board_columns(board)
+    return (
+        select(*columns)
+        .where(*board_filter(board))
+        .order_by(*[key.desc() for key in keys], Topic.id.desc())     # ties newest first: a plain backwards index walk
+        .limit(limit)
+    )
+
+def ranked_above(keys, values):
+    """Rows whose sort key is strictly greater than values, e.g. level > L OR (level = L AND exp > E)"""
+    return or_(*[
+        and_(*[key == value for key, value in zip(keys[:i], values[:i])], keys[i] > values[i])
+        for i in range(len(keys))
+    ])
+
+def rank_query(board: str, values):
+    """Topics ahead of a topic with these sort key values: a range count on the board's index"""
+    return select(func.count()).select_from(Topic).where(*board_filter(board), ranked_above(board_columns(board), values))
+
+def week_rank_query(minutes: int):
+    totals = rollup_in_range(
+        select(func.sum(DailyTopicMinutes.minutes).label("minutes")).group_by(DailyTopicMinutes.topic_id),
+        week_start(), None,
+    ).subquery()
+    return select(func.count()).select_from(totals).where(totals.c.minutes > minutes)
+
+def with_ranks(entries, key):
+    """Competition ranking (1, 2, 2, 4): ties share a rank"""
+    previous, rank = None, 0
+    for position, entry in enumerate(entries, start=1):
+        if key(entry) != previous:
+            previous, rank = key(entry), position
+        entry["rank"] = rank
+    return entries
+
+@router.get("/week")
+def get_week_leaderboard(limit: int = Query(default=10, ge=1, le=100), db: Session = Depends(get_session)):
+    """Topics by minutes studied in the last 7 days (UTC), most first"""
+    rows = db.exec(topic_stats_query(week_start(), None).limit(limit)).all()
+    entries = with_ranks([dict(row._mapping) for row in rows], key=lambda entry: entry["minutes"])
+    return {"board": "week", "since": week_start(), "entries": entries}
+
+@router.get("/week/topics/{topic_id}")
+def get_week_rank(topic_id: int, db: Session = Depends(get_session)):
+    """Rank of one topic on the week board (topics with no minutes this week share the last rank)"""
+    if db.get(Topic, topic_id) is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    minutes = db.exec(rollup_in_range(
+        select(func.coalesce(func.sum(DailyTopicMinutes.minutes), 0)).where(DailyTopicMinutes.topic_id == topic_id),
+        week_start(), None,
+    )).one()
+    ahead = db.exec(week_rank_query(minutes)).one()
+    return {"board": "week", "topic_id": topic_id, "rank": ahead + 1, "minutes": minutes}
+
+@router.get("/{board}")
+def get_leaderboard(board: str, limit: int = Query(default=10, ge=1, le=100), db: Session = Depends(get_session)):
+    """
+    Top topics by Pokémon level (then EXP), by EXP or by total minutes.
+    Entries are dashboard topic summaries (EXP to the next level included) plus their rank.
+    """
+    keys = [key.key for key in board_columns(board)]
+    rows, deltas = exp_accumulator.read(lambda: db.exec(top_topics_query(board, limit)).all(), user_of(db))
+    # rank on the committed values the rows were ordered by, then merge in any pending EXP for display
+    ranked = with_ranks([dict(row._mapping) for row in rows], key=lambda entry: tuple(entry[name] for name in keys))
+    return {"board": board, "entries": [topic_summary(entry, user_of(db), deltas) for entry in ranked]}
+
+@router.get("/{board}/topics/{topic_id}")
+def get_rank(board: str, topic_id: int, db: Session = Depends(get_session)):
+    """Rank of one topic on a board: 1 + the number of topics strictly ahead of it"""
+    keys = board_columns(board)
+    topic = db.get(Topic, topic_id)
+    if topic is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    if board in POKEMON_BOARDS and not topic.pokemon_id:
+        raise HTTPException(status_code=400, detail="Topic has no Pokémon assigned")
+    values = [getattr(topic, key.key) for key in keys]
+    ahead = db.exec(rank_query(board, values)).one()
+    return {"board": board, "topic_id": topic_id, "rank": ahead + 1, **{key.key: value for key, value in zip(keys, values)}}
+
+# leaderboard.py serves rankings (top-N and rank of one topic) from the Topic indexes
+# and the daily rollup, instead of the client downloading every topic and sorting.
@@ -0,0 +1,68 @@
+from typing import Dict
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import metrics, render_gauges
+from ..pokemon.pokemon_cache import pokemon_cache
+from ..pokemon.pokemon_client import pokemon_client
+from ..pokemon.sprite_cache import sprite_cache
+from ..response_cache import cache_counters
+from ..exp_accumulator import exp_accumulator
+from ..events import event_bus
+from ..session_timer import session_timer
+from ..database import shard_router
+
+router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def by_label(label: str, values: Dict[str, float]) -> Dict:
+    return {((label, name),): value for name, value in values.items()}
+
+def ratio(part: float, whole: float) -> float:
+    return part / whole if whole else 0.0
+
+def cache_lines():
+    """Counters other modules keep for themselves, read at scrape time"""
+    pokemon = pokemon_cache.stats()
+    lookups = pokemon["hits"] + pokemon["misses"]
+    responses = cache_counters["hits"] + cache_counters["misses"] + cache_counters["not_modified"]
+    events = event_bus.stats()
+    shards = shard_router.stats()
+
+    lines = []
+    lines += render_gauges("studymon_pokemon_cache_events_total", "Pokémon cache lookups by outcome",
+                           by_label("event", {name: value for name, value in pokemon.items() if name not in ("size", "max_entries")}),
+                           kind="counter")
+    lines += render_gauges("studymon_pokemon_cache_entries", "Pokémon entries held in memory", {(): pokemon["size"]})
+    lines += render_gauges("studymon_pokemon_cache_hit_ratio", "Share of Pokémon lookups served without going upstream",
+                           by_label("layer", {
+                               "memory": ratio(pokemon["hits"], lookups),
+                               "memory_or_store": ratio(pokemon["hits"] + pokemon["store_hits"], lookups),
+                           }))
+    lines += render_gauges("studymon_pokemon_client_events_total", "Async Pokémon client fetches and coalesced waits",
+                           by_label("event", pokemon_client.counters), kind="counter")
+    lines += render_gauges("studymon_sprite_cache_events_total", "Sprites served from disk, downloads, failures and sheets baked",
+                           by_label("event", sprite_cache.counters), kind="counter")
+    lines += render_gauges("studymon_response_cache_events_total", "Cached GET responses by outcome",
+                           by_label("result", cache_counters), kind="counter")
+    lines += render_gauges("studymon_response_cache_hit_ratio", "Share of cacheable GETs answered from the response cache",
+                           {(): ratio(cache_counters["hits"] + cache_counters["not_modified"], responses)})
+    lines += render_gauges("studymon_exp_accumulator_events_total", "Buffered add-exp updates and flushes",
+                           by_label("event", exp_accumulator.counters), kind="counter")
+    lines += render_gauges("studymon_session_timers", "Open sessions with a heartbeat in memory", {(): session_timer.tracked()})
+    lines += render_gauges("studymon_session_timer_events_total", "Heartbeats, refused heartbeats, reaper passes and sessions it closed",
+                           by_label("event", session_timer.counters), kind="counter")
+    lines += render_gauges("studymon_shard_engines_open", "Per-user database engines open (LRU)", {(): shards.pop("open")})
+    lines += render_gauges("studymon_shard_engines_max", "Most per-user database engines kept open", {(): shards.pop("max_open")})
+    lines += render_gauges("studymon_shard_router_events_total", "Shard engine lookups that hit the LRU, opens and evictions",
+                           by_label("event", shards), kind="counter")
+    lines += render_gauges("studymon_event_stream_subscribers", "Open /events streams", {(): events.pop("subscribers")})
+    lines += render_gauges("studymon_event_bus_events_total", "Published/delivered/dropped events",
+                           by_label("event", events), kind="counter")
+    return lines
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text format: request/SQL/PokéAPI latency histograms and cache hit rates"""
+    lines = metrics.render() + cache_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,30 +1,87 @@
-from fastapi import APIRouter
-from ..pokemon.pokemon_utils import fetch_pokemon_data, STARTER_POKEMON
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from ..pokemon.pokemon_utils import STARTER_POKEMON
+from ..pokemon.pokemon_cache import pokemon_cache
+from ..pokemon.pokemon_client import pokemon_client
+from ..pokemon.sprite_cache import SHEETS, CachedFile, sprite_cache
+from ..response_cache import POKEMON_CACHE_CONTROL, not_modified
 import random
 
 router = APIRouter(prefix="/pokemon", tags=["Pokemon"])
 
+GEN_1_IDS = range(1, 152)
+
+def cached_file_response(request: Request, cached: CachedFile, media_type: str) -> Response:
+    """
+    A file from the sprite cache: the content digest is a strong ETag, and FileResponse streams
+    the file from disk instead of it being held in memory (or copied into the response cache).
+    """
+    path, digest = cached
+    headers = {"etag": f'"{digest}"', "cache-control": POKEMON_CACHE_CONTROL}
+    if not_modified(request, headers["etag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+async def load_sheet(sheet: str):
+    if sheet not in SHEETS:
+        raise HTTPException(status_code=404, detail=f"Unknown sprite sheet: {sheet}")
+    cached = await sprite_cache.sheet(sheet)
+    if cached is None:
+        raise HTTPException(status_code=503, detail="Some sprites couldn't be downloaded, try again later")
+    return cached
+
 @router.get("/starters")
-def get_starters():
+async def get_starters():
     """Get the three starter Pokémon (Bulbasaur, Charmander, Squirtle)"""
-    starters = []
-    for name, pokemon_id in STARTER_POKEMON.items():
-        data = fetch_pokemon_data(pokemon_id)
-        if data:
-            starters.append(data)
-    return starters
+    results = await pokemon_client.get_many(list(STARTER_POKEMON.values()))
+    return [data for data in results if data]
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Hit/miss/eviction counters for the Pokémon data cache (and the sprite cache)"""
+    return {**pokemon_cache.stats(), "client": pokemon_client.counters, "sprites": sprite_cache.stats()}
+
+@router.get("/encounters")
+async def random_encounters(count: int = Query(default=3, ge=1, le=10)):
+    """Safari Zone: Get `count` distinct random Pokémon (Gen 1) in one request"""
+    random_ids = random.sample(GEN_1_IDS, count)
+    results = await pokemon_client.get_many(random_ids)
+    return [data for data in results if data]
+
+@router.get("/sprites/{sheet}.svg")
+async def get_sprite_sheet(sheet: str, request: Request):
+    """
+    Every sprite of a sheet (gen1: #1-151) in one SVG, so a screen full of Pokémon is one request.
+    Show one sprite with <img src=".../gen1.svg#pokemon-25">; every fragment shares the one download.
+    """
+    cached = await load_sheet(sheet)
+    return cached_file_response(request, cached[0], "image/svg+xml")
+
+@router.get("/sprites/{sheet}.json")
+async def get_sprite_atlas(sheet: str, request: Request):
+    """Where each sprite sits on a sheet: {"sprites": {"25": {"x", "y", "fragment"}}, "sprite_size", "etag", ...}"""
+    cached = await load_sheet(sheet)
+    return cached_file_response(request, cached[1], "application/json")
+
+@router.get("/{pokemon_id}/sprite")
+async def get_sprite(pokemon_id: int, request: Request):
+    """A Pokémon's sprite (PNG) from the local sprite cache, downloaded once on first request"""
+    cached = await sprite_cache.get(pokemon_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Sprite not found")
+    return cached_file_response(request, cached, "image/png")
 
 @router.get("/{pokemon_id}")
-def get_pokemon(pokemon_id: int):
+async def get_pokemon(pokemon_id: int):
     """Get data for a specific Pokémon by ID"""
-    data = fetch_pokemon_data(pokemon_id)
+    data = await pokemon_client.get(pokemon_id)
     if not data:
         return {"error": "Pokémon not found"}
     return data
 
 @router.get("/random/encounter")
-def random_encounter():
+async def random_encounter():
     """Safari Zone: Get a random Pokémon (1-151 for Gen 1)"""
     random_id = random.randint(1, 151)
-    data = fetch_pokemon_data(random_id)
-    return data if data else {"error": "Failed to find Pokémon"}
\ No newline at end of file
+    data = await pokemon_client.get(random_id)
+    return data if data else {"error": "Failed to find Pokémon"}
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
-from ..database import get_session
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request, Response
+from sqlmodel import Session, select, or_, and_
+from typing import Optional
+from ..database import get_session, user_from_request, user_of
 from ..models import StudySession, Topic
-from ..session_schemas import SessionCreate, SessionEnd, SessionResponse
-from datetime import datetime
-from ..pokemon.pokemon_utils import calculate_level_from_exp, EXP_PER_MINUTE, check_evolution, fetch_pokemon_data
+from ..session_schemas import SessionCreate, SessionEnd, SessionResponse, BulkSessionCreate
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..crud import close_session, increment_topic_progress, hydrate_topic_pokemon, needs_hydration
+from ..session_timer import session_timer
+from ..events import event_bus, publish_after_commit
+from ..rollups import apply_session_to_rollup, add_to_daily_rollup
+from ..pagination import (MAX_PAGE_SIZE, cursor_datetime, cursor_int, decode_cursor, list_query, ndjson_response,
+                          page_response, parse_fields)
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -24,86 +32,168 @@ def start_session(session_data: SessionCreate, db: Session = Depends(get_session
     db.add(new_session)
     db.commit()
     db.refresh(new_session)
+    event_bus.publish("session_started", new_session.model_dump(exclude={"client_key"}), user_of(db))
     return new_session
 
+@router.post("/{session_id}/heartbeat", status_code=204)
+async def session_heartbeat(session_id: int, request: Request, paused: bool = False):
+    """
+    Keep a running timer's session alive (paused=true while the timer is paused).
+    Only touches the in-memory timer, no database work, so it's async: no threadpool hop either.
+    """
+    if not session_timer.beat(session_id, paused, user_id=user_from_request(request)):
+        raise HTTPException(status_code=503, detail="Too many active sessions")
+    return Response(status_code=204)
+
 @router.post("/{session_id}/end", response_model=SessionResponse)
-def end_session(session_id: int, session_data: SessionEnd, db: Session = Depends(get_session)):
-    """End a study session and update topic's total minutes"""
-    # Get session
-    study_session = db.get(StudySession, session_id)
-    if not study_session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    if study_session.end_time is not None:
+def end_session(session_id: int, background_tasks: BackgroundTasks, session_data: Optional[SessionEnd] = None,
+                db: Session = Depends(get_session)):
+    """
+    End a study session and update topic's total minutes.
+    The duration is timed on the server from start_time, minus time paused (see heartbeat).
+    Older clients send no heartbeats and time the session themselves: their duration_minutes
+    can shorten the server's count (e.g. time spent paused), never lengthen it.
+    """
+    # Close the session, add its minutes to the topic (EXP, level, evolution) and the daily totals
+    user_id = user_of(db)
+    client_minutes = None
+    if session_data and not session_timer.heard_from(session_id, user_id):
+        client_minutes = session_data.duration_minutes
+    study_session, topic, evolution_data = close_session(
+        db, session_id, datetime.utcnow(), session_timer.paused_seconds(session_id, user_id=user_id), client_minutes)
+    if study_session is None:
+        db.rollback()
+        if not db.get(StudySession, session_id):
+            raise HTTPException(status_code=404, detail="Session not found")
         raise HTTPException(status_code=400, detail="Session already ended")
     
-    # Update session
-    study_session.end_time = datetime.utcnow()
-    study_session.duration_minutes = session_data.duration_minutes
-    
-    # Update topic's total minutes
-    topic = db.get(Topic, study_session.topic_id)
-    evolution_data = None
+    # Target wasn't precomputed, backfill name/sprite after the commit
+    if evolution_data and needs_hydration(topic):
+        background_tasks.add_task(hydrate_topic_pokemon, topic.id, topic.pokemon_id, user_id)
     
-    if topic:
-        topic.minutes_spent += session_data.duration_minutes
-        
-        # Auto-update status to in_progress if it was not_started
-        if topic.status == "not_started":
-            topic.status = "in_progress"
-        
-        # Add EXP to Pokémon if assigned
-        if topic.pokemon_id:
-            exp_gained = session_data.duration_minutes * EXP_PER_MINUTE
-            old_level = topic.pokemon_level
-            topic.pokemon_exp += exp_gained
-            
-            # Calculate new level
-            new_level, _ = calculate_level_from_exp(topic.pokemon_exp)
-            topic.pokemon_level = new_level
-            
-            # Check for evolution
-            if new_level > old_level:
-                evolution_check = check_evolution(topic.pokemon_id, new_level)
-                if evolution_check:
-                    # Evolve the Pokémon!
-                    evolution_data = {
-                        "evolved": True,
-                        "from_name": topic.pokemon_name,
-                        "from_id": topic.pokemon_id,
-                        "to_name": evolution_check["evolves_to_name"],
-                        "to_id": evolution_check["evolves_to_id"],
-                        "at_level": new_level
-                    }
-                    
-                    # Update topic with evolved Pokémon
-                    topic.pokemon_id = evolution_check["evolves_to_id"]
-                    topic.pokemon_name = evolution_check["evolves_to_name"]
-                    topic.pokemon_sprite_url = evolution_check["evolves_to_sprite"]
-    
-    db.add(study_session)
-    db.add(topic)
     db.commit()
-    db.refresh(study_session)
+    session_timer.forget(session_id, user_id)
     
     # Return session with evolution data if it happened
-    response = study_session.dict()
+    response = study_session.model_dump()
     if evolution_data:
         response["evolution"] = evolution_data
     
     return response
 
+def to_utc_naive(value: datetime) -> datetime:
+    """Sessions are stored as naive UTC, like datetime.utcnow()"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.post("/bulk")
+def bulk_create_sessions(bulk_data: BulkSessionCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_session)):
+    """
+    Upload many completed sessions at once (offline/mobile clients).
+    All sessions are inserted with one statement in one transaction, then each topic gets
+    a single minutes/EXP/level/evolution update. Sessions whose client_key was already
+    uploaded are skipped, so retrying a request never counts anything twice.
+    """
+    items = bulk_data.sessions
+    topic_ids = {item.topic_id for item in items}
+    topics = {topic.id: topic for topic in db.exec(select(Topic).where(Topic.id.in_(topic_ids))).all()}
+    missing = sorted(topic_ids - topics.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Topics not found: {missing}")
+
+    rows = {}
+    for item in items:      # a key repeated inside one request only counts once too
+        start_time = to_utc_naive(item.start_time)
+        end_time = to_utc_naive(item.end_time) if item.end_time else start_time + timedelta(minutes=item.duration_minutes)
+        rows.setdefault(item.client_key, {
+            "client_key": item.client_key,
+            "topic_id": item.topic_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration_minutes": item.duration_minutes,
+        })
+
+    # ON CONFLICT DO NOTHING + RETURNING tells us exactly which keys are new, even with concurrent retries
+    statement = (
+        sqlite_insert(StudySession)
+        .on_conflict_do_nothing(index_elements=[StudySession.client_key])
+        .returning(StudySession.client_key)
+    )
+    inserted_keys = set(db.connection().execute(statement, list(rows.values())).scalars().all()) if rows else set()
+    inserted = [row for key, row in rows.items() if key in inserted_keys]
+
+    minutes_per_topic = defaultdict(int)
+    daily = defaultdict(lambda: {"minutes": 0, "session_count": 0})
+    for row in inserted:
+        minutes_per_topic[row["topic_id"]] += row["duration_minutes"]
+        day_totals = daily[(row["topic_id"], row["start_time"].date())]
+        day_totals["minutes"] += row["duration_minutes"]
+        day_totals["session_count"] += 1
+
+    results = []
+    for topic_id, minutes in minutes_per_topic.items():
+        old_level = topics[topic_id].pokemon_level
+        topic, evolution_data = increment_topic_progress(db, topic_id, minutes)
+        if evolution_data and needs_hydration(topic):
+            background_tasks.add_task(hydrate_topic_pokemon, topic.id, topic.pokemon_id, user_of(db))
+        results.append({
+            "topic_id": topic_id,
+            "minutes_added": minutes,
+            "old_level": old_level,
+            "new_level": topic.pokemon_level,
+            "evolution": evolution_data,
+        })
+
+    add_to_daily_rollup(db, [
+        {"topic_id": topic_id, "day": day, **totals} for (topic_id, day), totals in daily.items()
+    ])
+    if inserted:
+        publish_after_commit(db, "sessions_uploaded", {"inserted": len(inserted), "topics": results})
+    db.commit()
+
+    return {
+        "inserted": len(inserted),
+        "duplicates": len(items) - len(inserted),
+        "topics": results,
+    }
+
 @router.get("/", response_model=list[SessionResponse])
-def get_sessions(topic_id: int = None, db: Session = Depends(get_session)):
-    """Get all sessions, optionally filtered by topic_id"""
-    query = select(StudySession)
+def get_sessions(
+    topic_id: int = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_session),
+):
+    """
+    Get all sessions (most recent first), optionally filtered by topic_id.
+    - limit/cursor: keyset pagination on (start_time, id), next page cursor is in the X-Next-Cursor header
+    - fields: comma separated columns to return, e.g. ?fields=id,duration_minutes
+    - stream: return NDJSON, one session per line (for large history exports)
+    """
+    key_names = ["start_time", "id"]
+    field_names = parse_fields(fields, StudySession, SessionResponse)
+    query, column_names = list_query(StudySession, field_names, key_names)
     if topic_id:
         query = query.where(StudySession.topic_id == topic_id)
-    sessions = db.exec(query).all()
-    return sessions
+    if cursor:
+        last_start, last_id = decode_cursor(cursor, cursor_datetime, cursor_int)
+        query = query.where(or_(
+            StudySession.start_time < last_start,
+            and_(StudySession.start_time == last_start, StudySession.id < last_id),
+        ))
+    query = query.order_by(StudySession.start_time.desc(), StudySession.id.desc())
+
+    if stream:
+        return ndjson_response(query, column_names, field_names, db_engine=db.get_bind(), schema=SessionResponse)
+    if limit:
+        query = query.limit(limit + 1)
+    return page_response(db.exec(query).all(), column_names, field_names, limit, key_names, schema=SessionResponse)
 
 @router.get("/{session_id}", response_model=SessionResponse)
-def get_session(session_id: int, db: Session = Depends(get_session)):
+def get_study_session(session_id: int, db: Session = Depends(get_session)):
     """Get a specific session"""
     session = db.get(StudySession, session_id)
     if not session:
@@ -112,11 +202,14 @@ def get_session(session_id: int, db: Session = Depends(get_session)):
 
 @router.delete("/{session_id}")
 def delete_session(session_id: int, db: Session = Depends(get_session)):
-    """Delete a session (removes it from history but doesn't update topic minutes)"""
+    """Delete a session (removes it from history and daily totals, but doesn't update topic minutes)"""
     session = db.get(StudySession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    if session.end_time is not None:
+        apply_session_to_rollup(db, session, sign=-1)
+    publish_after_commit(db, "session_deleted", {"session_id": session.id, "topic_id": session.topic_id})
     db.delete(session)
     db.commit()
     return {"message": "Session deleted successfully"}
\ No newline at end of file
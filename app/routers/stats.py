@@ -0,0 +1,161 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select, func
+from datetime import date, datetime, timedelta
+from typing import Optional
+from ..database import get_session
+from ..models import StudySession, Topic, DailyTopicMinutes
+from ..stats_schemas import TopicStats, PeriodStats, StatsSummary, StreakStats, StatusCount
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+# All aggregation happens in SQL (GROUP BY), so responses stay small
+# no matter how many sessions a user has. Queries read the daily_topic_minutes
+# rollup (UTC days, O(days) rows); only a non-zero tz_offset_minutes has to
+# fall back to the raw sessions, since the rollup can't be re-bucketed by hour.
+
+def rollup_in_range(query, start: Optional[date], end: Optional[date]):
+    """Restrict a rollup query to days within [start, end] (both inclusive)"""
+    if start:
+        query = query.where(DailyTopicMinutes.day >= start)
+    if end:
+        query = query.where(DailyTopicMinutes.day <= end)
+    return query
+
+def completed_sessions(query, start: Optional[date], end: Optional[date], tz_offset_minutes: int = 0):
+    """
+    Restrict a query to ended sessions that started within [start, end] (both inclusive),
+    days in the client's timezone: the bounds are local midnights, moved to UTC like local_day
+    """
+    query = query.where(StudySession.end_time != None)
+    offset = timedelta(minutes=tz_offset_minutes)
+    if start:
+        query = query.where(StudySession.start_time >= datetime.combine(start, datetime.min.time()) - offset)
+    if end:
+        query = query.where(StudySession.start_time < datetime.combine(end + timedelta(days=1), datetime.min.time()) - offset)
+    return query
+
+def local_day(tz_offset_minutes: int):
+    """SQL expression for the calendar day a session started on, shifted to the client's timezone"""
+    return func.date(StudySession.start_time, f"{tz_offset_minutes:+d} minutes")
+
+def topic_stats_query(start: Optional[date], end: Optional[date]):
+    minutes = func.sum(DailyTopicMinutes.minutes)
+    query = (
+        select(
+            DailyTopicMinutes.topic_id,
+            Topic.title,
+            minutes.label("minutes"),
+            func.sum(DailyTopicMinutes.session_count).label("session_count"),
+        )
+        .join(Topic, Topic.id == DailyTopicMinutes.topic_id, isouter=True)
+        .group_by(DailyTopicMinutes.topic_id)
+        .order_by(minutes.desc())
+    )
+    return rollup_in_range(query, start, end)
+
+@router.get("/summary", response_model=StatsSummary)
+def get_summary(start: Optional[date] = None, end: Optional[date] = None, db: Session = Depends(get_session)):
+    """Total minutes, session count, average session length and most studied topic"""
+    totals_query = select(
+        func.coalesce(func.sum(DailyTopicMinutes.minutes), 0),
+        func.coalesce(func.sum(DailyTopicMinutes.session_count), 0),
+    )
+    total_minutes, total_sessions = db.exec(rollup_in_range(totals_query, start, end)).one()
+    top = db.exec(topic_stats_query(start, end).limit(1)).first()
+
+    return StatsSummary(
+        total_minutes=total_minutes,
+        total_sessions=total_sessions,
+        average_session_minutes=round(total_minutes / total_sessions) if total_sessions else 0,
+        most_studied=TopicStats(**top._mapping) if top else None,
+    )
+
+@router.get("/topics", response_model=list[TopicStats])
+def get_topic_stats(start: Optional[date] = None, end: Optional[date] = None, db: Session = Depends(get_session)):
+    """Minutes and session count per topic, most studied first"""
+    rows = db.exec(topic_stats_query(start, end)).all()
+    return [TopicStats(**row._mapping) for row in rows]
+
+@router.get("/daily", response_model=list[PeriodStats])
+def get_daily_stats(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    tz_offset_minutes: int = 0,
+    db: Session = Depends(get_session),
+):
+    """Minutes and session count per day (only days with sessions are returned)"""
+    if tz_offset_minutes == 0:
+        query = (
+            select(DailyTopicMinutes.day, func.sum(DailyTopicMinutes.minutes), func.sum(DailyTopicMinutes.session_count))
+            .group_by(DailyTopicMinutes.day)
+            .order_by(DailyTopicMinutes.day)
+        )
+        rows = db.exec(rollup_in_range(query, start, end)).all()
+        return [PeriodStats(period=day.isoformat(), minutes=minutes, session_count=count) for day, minutes, count in rows]
+
+    day = local_day(tz_offset_minutes)
+    query = (
+        select(day.label("period"), func.sum(StudySession.duration_minutes), func.count())
+        .group_by(day)
+        .order_by(day)
+    )
+    rows = db.exec(completed_sessions(query, start, end, tz_offset_minutes)).all()
+    return [PeriodStats(period=period, minutes=minutes, session_count=count) for period, minutes, count in rows]
+
+@router.get("/weekly", response_model=list[PeriodStats])
+def get_weekly_stats(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    tz_offset_minutes: int = 0,
+    db: Session = Depends(get_session),
+):
+    """Minutes and session count per week (weeks start on Monday)"""
+    if tz_offset_minutes == 0:
+        week = func.strftime("%Y-W%W", DailyTopicMinutes.day)
+        query = (
+            select(week.label("period"), func.sum(DailyTopicMinutes.minutes), func.sum(DailyTopicMinutes.session_count))
+            .group_by(week)
+            .order_by(week)
+        )
+        rows = db.exec(rollup_in_range(query, start, end)).all()
+        return [PeriodStats(period=period, minutes=minutes, session_count=count) for period, minutes, count in rows]
+
+    week = func.strftime("%Y-W%W", StudySession.start_time, f"{tz_offset_minutes:+d} minutes")
+    query = (
+        select(week.label("period"), func.sum(StudySession.duration_minutes), func.count())
+        .group_by(week)
+        .order_by(week)
+    )
+    rows = db.exec(completed_sessions(query, start, end, tz_offset_minutes)).all()
+    return [PeriodStats(period=period, minutes=minutes, session_count=count) for period, minutes, count in rows]
+
+@router.get("/streaks", response_model=StreakStats)
+def get_streaks(tz_offset_minutes: int = 0, db: Session = Depends(get_session)):
+    """Current and longest run of consecutive study days"""
+    if tz_offset_minutes == 0:
+        days = list(db.exec(select(DailyTopicMinutes.day).distinct().order_by(DailyTopicMinutes.day)).all())
+    else:
+        day = local_day(tz_offset_minutes)
+        query = completed_sessions(select(day).distinct().order_by(day), None, None)
+        days = [date.fromisoformat(row) for row in db.exec(query).all()]
+    if not days:
+        return StreakStats(current_streak=0, longest_streak=0, last_study_day=None)
+
+    longest = run = 1
+    for previous, current in zip(days, days[1:]):
+        run = run + 1 if current - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+
+    # the current streak is still alive if the last study day was today or yesterday
+    today = (datetime.utcnow() + timedelta(minutes=tz_offset_minutes)).date()
+    current = run if today - days[-1] <= timedelta(days=1) else 0
+    return StreakStats(current_streak=current, longest_streak=longest, last_study_day=days[-1])
+
+@router.get("/status", response_model=list[StatusCount])
+def get_status_breakdown(db: Session = Depends(get_session)):
+    """Number of topics in each status"""
+    rows = db.exec(select(Topic.status, func.count()).group_by(Topic.status)).all()
+    return [StatusCount(status=status, count=count) for status, count in rows]
+
+# stats.py serves the Statistics dashboard: totals per topic, per day/week,
+# streaks, average session length and status breakdowns, all computed with
+# GROUP BY queries (mostly over the daily rollup) and optionally limited to a start/end date range.
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
-from app.database import get_session
+from functools import partial
+from app.database import get_session, user_of
 from app.models import Topic
 from app.schemas import TopicUpdate
 from app.schemas import TopicCreate
 from typing import Optional
 from ..pokemon.pokemon_utils import (fetch_pokemon_data, calculate_level_from_exp, EXP_PER_MINUTE, STARTER_POKEMON)
+from ..crud import recalculate_levels
+from ..exp_accumulator import exp_accumulator
+from ..response_cache import data_version
+from ..events import event_bus
+from ..pagination import MAX_PAGE_SIZE, cursor_int, decode_cursor, list_query, ndjson_response, page_response, parse_fields
+from ..pokemon.pokemon_client import pokemon_client
 
 router = APIRouter(prefix = "/topics", tags = ["Topics"])
 # router creates all the routes used (post, get, get specific id) and sets that
@@ -30,27 +37,60 @@ def create_topic(topic_data: TopicCreate, pokemon_id: int = None, db: Session =
     db.add(topic)
     db.commit()
     db.refresh(topic)
+    event_bus.publish("topic_created", topic.model_dump(), user_of(db))
     return topic
 # recieves new Topic object
 # mark it to add to database, then adds it (commit)
 # then reloads obj with its id and returns it as json
 
+@router.post("/recalculate-levels")
+def recalculate_topic_levels(db: Session = Depends(get_session)):
+    """Recompute every Pokémon's level from its EXP (e.g. after changing a growth curve)"""
+    updated = recalculate_levels(db)
+    return {"updated": updated}
+
 @router.get("/", response_model = list[Topic])
-def list_topics(status: str = None, db: Session = Depends(get_session)):
-    """Get all topics, optionally filtered by status"""
-    query = select(Topic)
+def list_topics(
+    status: str = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default = None, ge = 1, le = MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_session),
+):
+    """
+    Get all topics, optionally filtered by status.
+    - limit/cursor: keyset pagination by id (next page cursor is in the X-Next-Cursor header)
+    - fields: comma separated columns to return, e.g. ?fields=id,title
+    - stream: return NDJSON, one topic per line
+    """
+    field_names = parse_fields(fields, Topic)
+    query, column_names = list_query(Topic, field_names, ["id"])
     if status:
         query = query.where(Topic.status == status)
-    topics = db.exec(query).all()
-    return topics
+    if cursor:
+        (last_id,) = decode_cursor(cursor, cursor_int)
+        query = query.where(Topic.id > last_id)
+    query = query.order_by(Topic.id)
+    if stream:
+        merge = partial(exp_accumulator.merge, user_id = user_of(db))
+        return ndjson_response(query, column_names, field_names, db_engine = db.get_bind(), transform = merge)
+    if limit:
+        query = query.limit(limit + 1)
+    # rows and the unflushed deltas read together (ExpAccumulator.read), so a flush can't slip between them
+    query = query.execution_options(populate_existing = True)
+    rows, deltas = exp_accumulator.read(lambda: db.exec(query).all(), user_of(db))
+    merge = partial(exp_accumulator.merge, user_id = user_of(db), deltas = deltas)
+    return page_response(rows, column_names, field_names, limit, ["id"], transform = merge)
 
 @router.get("/{topic_id}", response_model = Topic)
 def get_topic(topic_id: int, db: Session = Depends(get_session)):
     """Get a specific topic"""
-    topic = db.get(Topic, topic_id)
+    query = select(Topic).where(Topic.id == topic_id).execution_options(populate_existing = True)
+    topic, deltas = exp_accumulator.read(lambda: db.exec(query).first(), user_of(db))
     if not topic:
         raise HTTPException(status_code = 404, detail = "Topic not found")
-    return topic
+    return exp_accumulator.merge(topic.model_dump(), user_of(db), deltas)
 # looks up topic by primary key (id)
 # if doesnt exist, raises a 404 error
 # otherwise, returns it
@@ -67,9 +107,14 @@ def update_topic(topic_id: int, topic_data: TopicUpdate, db: Session = Depends(g
     for key, value in update_data.items():
         setattr(topic, key, value)
 
+    # switching growth curves changes the level the current EXP is worth
+    if "growth_rate" in update_data:
+        topic.pokemon_level, _ = calculate_level_from_exp(topic.pokemon_exp, topic.growth_rate)
+
     db.add(topic)
     db.commit()
     db.refresh(topic)
+    event_bus.publish("topic_updated", topic.model_dump(), user_of(db))
     return topic
 
 @router.patch("/{topic_id}/assign-pokemon")
@@ -92,13 +137,14 @@ def assign_pokemon(topic_id: int, pokemon_id: int, db: Session = Depends(get_ses
     db.add(topic)
     db.commit()
     db.refresh(topic)
+    event_bus.publish("topic_updated", topic.model_dump(), user_of(db))
     return topic
 
 @router.post("/{topic_id}/add-exp")
 def add_exp_to_pokemon(topic_id: int, minutes: int, db: Session = Depends(get_session)):
     """
     Add EXP to topic's Pokémon based on study minutes.
-    Automatically levels up if enough EXP.
+    Automatically levels up (and evolves) if enough EXP, once the update is flushed.
     """
     topic = db.get(Topic, topic_id)
     if not topic:
@@ -107,22 +153,23 @@ def add_exp_to_pokemon(topic_id: int, minutes: int, db: Session = Depends(get_se
     if not topic.pokemon_id:
         raise HTTPException(status_code=400, detail="Topic has no Pokémon assigned")
     
-    # Calculate EXP gained
+    # Buffer the EXP, the accumulator writes it (and levels up/evolves) in its next batched flush
     exp_gained = minutes * EXP_PER_MINUTE
-    topic.pokemon_exp += exp_gained
+    exp_accumulator.add(topic_id, exp = exp_gained, user_id = user_of(db))
+    data_version.bump()     # reads merge pending EXP, so cached topic responses are stale now
     
-    # Calculate new level
-    new_level, exp_in_level = calculate_level_from_exp(topic.pokemon_exp)
-    old_level = topic.pokemon_level
-    topic.pokemon_level = new_level
-    
-    db.add(topic)
-    db.commit()
-    db.refresh(topic)
+    # Report progress including everything accepted but not flushed yet
+    # (read together with the stored EXP, a flush can't move the delta between the two reads;
+    # a column select, so each retry queries again instead of hitting the identity map)
+    def stored_exp() -> int:
+        return db.exec(select(Topic.pokemon_exp).where(Topic.id == topic_id)).first() or 0
+    total_exp = exp_accumulator.snapshot(topic_id, stored_exp, user_of(db))
+    old_level, _ = calculate_level_from_exp(total_exp - exp_gained, topic.growth_rate)
+    new_level, _ = calculate_level_from_exp(total_exp, topic.growth_rate)
     
     return {
         "exp_gained": exp_gained,
-        "total_exp": topic.pokemon_exp,
+        "total_exp": total_exp,
         "old_level": old_level,
         "new_level": new_level,
         "leveled_up": new_level > old_level
@@ -138,18 +185,14 @@ def delete_topic(topic_id: int, db: Session = Depends(get_session)):
 
     db.delete(topic)
     db.commit()
+    event_bus.publish("topic_deleted", {"topic_id": topic_id}, user_of(db))
     return { "message": "Topic deleted successfully" }
 
 @router.get("/starters/list")
-def get_starters():
+async def get_starters():
     """Get the three starter pokemon"""
-    starters = []
-    for name, pokemon_id in STARTER_POKEMON.items():
-        data = fetch_pokemon_data(pokemon_id)
-        if data:
-            starters.append(data)
-    
-    return starters
+    results = await pokemon_client.get_many(list(STARTER_POKEMON.values()))
+    return [data for data in results if data]
 
 # topics.py defines the routes for managing Topic objects:
 # - POST /topics: create a new topic in the database
@@ -1,16 +1,20 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 
+GROWTH_RATE_PATTERN = "^(medium_fast|fast|medium_slow|slow|erratic|fluctuating)$"
+
 class TopicCreate(BaseModel):
     title: str
     description: str
     status: str = "not_started"
     minutes_spent: int = 0
+    growth_rate: str = Field(default = "medium_fast", pattern = GROWTH_RATE_PATTERN)
 
 class TopicUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[str] = Field(default = None, pattern = "^(not_started|in_progress|done)$")
     minutes_spent: Optional[int] = Field(default = None, ge = 0)
+    growth_rate: Optional[str] = Field(default = None, pattern = GROWTH_RATE_PATTERN)
 
     
\ No newline at end of file
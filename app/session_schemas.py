@@ -1,12 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
+MAX_SESSION_MINUTES = 24 * 60     # open sessions are closed as abandoned after a day at the latest
+
 class SessionCreate(BaseModel):
     topic_id: int
 
 class SessionEnd(BaseModel):
-    duration_minutes: int
+    # older clients (no heartbeats) send their own count: it caps the server-timed duration, never raises it
+    duration_minutes: Optional[int] = Field(default=None, ge=0, le=MAX_SESSION_MINUTES)
 
 class SessionResponse(BaseModel):
     id: int
@@ -16,4 +19,14 @@ class SessionResponse(BaseModel):
     duration_minutes: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BulkSessionItem(BaseModel):
+    client_key: str = Field(min_length=1, max_length=64)   # unique per session on the client, makes retries safe
+    topic_id: int
+    start_time: datetime
+    end_time: Optional[datetime] = None                   # defaults to start_time + duration_minutes
+    duration_minutes: int = Field(ge=0)
+
+class BulkSessionCreate(BaseModel):
+    sessions: List[BulkSessionItem] = Field(max_length=1000)
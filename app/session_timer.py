@@ -0,0 +1,202 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select, or_, and_
+
+from app.database import USER_KEY, shard_router
+from app.models import StudySession
+from app.crud import close_session, hydrate_topic_pokemon, needs_hydration
+
+HEARTBEAT_SECONDS = 30              # how often a running timer pings POST /sessions/{id}/heartbeat
+STALE_AFTER_SECONDS = 300           # no heartbeat for this long: the timer was abandoned
+UNSEEN_STALE_AFTER_SECONDS = 86400  # open sessions this process never heard from (older versions, restarts)
+REAP_INTERVAL_SECONDS = 60
+REAP_BATCH_SIZE = 500               # sessions closed per transaction
+MAX_TRACKED_SESSIONS = 100000       # heartbeats for new sessions are refused past this
+FULL_SWEEP_INTERVAL_SECONDS = 3600  # also visit shards with no heartbeats in memory, for sessions never heard from
+
+TimerKey = Tuple[Optional[str], int]    # (user id, session id): session ids are only unique within a shard
+
+def stale_candidates_query(started_before: datetime, after: Optional[tuple], limit: int):
+    """Open sessions that started before a cutoff, keyset-paged on (start_time, id) through ix_studysession_open"""
+    query = select(StudySession.id, StudySession.start_time).where(
+        StudySession.end_time == None, StudySession.start_time < started_before,
+    )
+    if after is not None:
+        last_start, last_id = after
+        query = query.where(or_(
+            StudySession.start_time > last_start,
+            and_(StudySession.start_time == last_start, StudySession.id > last_id),
+        ))
+    return query.order_by(StudySession.start_time, StudySession.id).limit(limit)
+
+class SessionTimer:
+    """
+    Server-side timing of open study sessions.
+    - beat() records a heartbeat in memory only (a dict write under a lock), no database work
+    - pause state is tracked from the heartbeats too, so paused time isn't counted
+    - a background reaper closes sessions whose heartbeats stopped, in batches, ending them
+      at their last heartbeat; sessions that never sent one (older clients, which time themselves
+      and send a duration to /end) are only closed after unseen_stale_after; each pass visits the default database and the shards of users
+      with heartbeats in memory, every shard on disk is visited once per full_sweep_interval
+    State is per process: run one worker, or route a session's heartbeats to the same worker.
+    """
+
+    def __init__(self, stale_after: float = STALE_AFTER_SECONDS,
+                 unseen_stale_after: float = UNSEEN_STALE_AFTER_SECONDS, reap_interval: float = REAP_INTERVAL_SECONDS,
+                 batch_size: int = REAP_BATCH_SIZE, max_tracked: int = MAX_TRACKED_SESSIONS,
+                 full_sweep_interval: float = FULL_SWEEP_INTERVAL_SECONDS):
+        self.stale_after = stale_after
+        self.unseen_stale_after = unseen_stale_after
+        self.reap_interval = reap_interval
+        self.batch_size = batch_size
+        self.max_tracked = max_tracked
+        self.full_sweep_interval = full_sweep_interval
+        self._last_seen: Dict[TimerKey, float] = {}     # -> unix time of the last heartbeat
+        self._paused_since: Dict[TimerKey, float] = {}
+        self._paused_total: Dict[TimerKey, float] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"heartbeats": 0, "rejected": 0, "reaped": 0, "reap_passes": 0}
+
+    def beat(self, session_id: int, paused: bool = False, now: Optional[float] = None,
+             user_id: Optional[str] = None) -> bool:
+        """Record a heartbeat; False if the session is new and the timer is already tracking max_tracked"""
+        now = time.time() if now is None else now
+        key = (user_id, session_id)
+        with self._lock:
+            if key not in self._last_seen and len(self._last_seen) >= self.max_tracked:
+                self.counters["rejected"] += 1
+                return False
+            self._last_seen[key] = now
+            if paused:
+                self._paused_since.setdefault(key, now)
+            else:
+                since = self._paused_since.pop(key, None)
+                if since is not None:
+                    self._paused_total[key] = self._paused_total.get(key, 0) + now - since
+            self.counters["heartbeats"] += 1
+        return True
+
+    def paused_seconds(self, session_id: int, now: Optional[float] = None, user_id: Optional[str] = None) -> float:
+        """Time the session has spent paused so far (including a pause that's still going)"""
+        now = time.time() if now is None else now
+        key = (user_id, session_id)
+        with self._lock:
+            since = self._paused_since.get(key)
+            return self._paused_total.get(key, 0) + (now - since if since is not None else 0)
+
+    def forget(self, session_id: int, user_id: Optional[str] = None) -> None:
+        key = (user_id, session_id)
+        with self._lock:
+            self._last_seen.pop(key, None)
+            self._paused_since.pop(key, None)
+            self._paused_total.pop(key, None)
+
+    def heard_from(self, session_id: int, user_id: Optional[str] = None) -> bool:
+        """True once the session has sent a heartbeat (older clients never do, they send a duration instead)"""
+        with self._lock:
+            return (user_id, session_id) in self._last_seen
+
+    def tracked(self) -> int:
+        return len(self._last_seen)
+
+    def reap(self, now: Optional[float] = None, full: bool = False) -> List[TimerKey]:
+        """
+        Close every abandoned session, batch_size per transaction. Returns the closed (user id, session id) pairs.
+        full: visit every shard on disk, not only the ones with heartbeats in memory.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            users = {user_id for user_id, _ in self._last_seen}
+        users.add(None)
+        if full:
+            users.update(shard_router.users())
+
+        closed, hydrate = [], []
+        for user_id in sorted(users, key = lambda user: user or ""):
+            with shard_router.borrow(user_id) as db_engine:
+                closed += self._reap_shard(db_engine, user_id, now, hydrate)
+
+        self.counters["reaped"] += len(closed)
+        self.counters["reap_passes"] += 1
+        for user_id, topic_id, pokemon_id in hydrate:
+            hydrate_topic_pokemon(topic_id, pokemon_id, user_id)
+        return closed
+
+    def _reap_shard(self, db_engine, user_id: Optional[str], now: float, hydrate: list) -> List[TimerKey]:
+        started_before = datetime.utcfromtimestamp(now - self.stale_after)     # newer sessions can't be stale yet
+        unseen_before = datetime.utcfromtimestamp(now - self.unseen_stale_after)
+        closed, after = [], None
+        with Session(db_engine, info = {USER_KEY: user_id}) as db:
+            while True:
+                candidates = db.exec(stale_candidates_query(started_before, after, self.batch_size)).all()
+                if not candidates:
+                    break
+                after = (candidates[-1].start_time, candidates[-1].id)
+
+                with self._lock:
+                    last_seen = {row.id: self._last_seen.get((user_id, row.id)) for row in candidates}
+                batch = []
+                for row in candidates:
+                    seen = last_seen[row.id]
+                    if seen is not None and seen < now - self.stale_after:
+                        batch.append((row.id, datetime.utcfromtimestamp(seen), self.paused_seconds(row.id, seen, user_id)))
+                    elif seen is None and row.start_time < unseen_before:
+                        batch.append((row.id, row.start_time, 0))   # never heard from: nothing to count
+                for session_id, end_time, paused in batch:
+                    study_session, topic, evolution_data = close_session(db, session_id, end_time, paused)
+                    if study_session is not None:
+                        closed.append((user_id, session_id))
+                        if evolution_data and needs_hydration(topic):
+                            hydrate.append((user_id, topic.id, topic.pokemon_id))
+                db.commit()
+                for session_id, _, _ in batch:
+                    self.forget(session_id, user_id)
+
+            # drop heartbeats for sessions that were ended some other way (or never existed)
+            with self._lock:
+                tracked = [session_id for user, session_id in self._last_seen if user == user_id]
+            for i in range(0, len(tracked), self.batch_size):
+                chunk = tracked[i:i + self.batch_size]
+                still_open = set(db.exec(
+                    select(StudySession.id).where(StudySession.id.in_(chunk), StudySession.end_time == None)
+                ).all())
+                for session_id in chunk:
+                    if session_id not in still_open:
+                        self.forget(session_id, user_id)
+        return closed
+
+    def _run(self) -> None:
+        last_full = time.monotonic()
+        while not self._stopping.wait(self.reap_interval):
+            full = time.monotonic() - last_full >= self.full_sweep_interval
+            if full:
+                last_full = time.monotonic()
+            try:
+                self.reap(full = full)
+            except Exception as e:
+                print(f"Error closing abandoned sessions: {e}")
+
+    def start(self) -> None:
+        """Start the background reaper thread"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target = self._run, name = "session-reaper", daemon = True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+session_timer = SessionTimer()
+
+# session_timer.py times study sessions on the server: clients send cheap heartbeats
+# (POST /sessions/{id}/heartbeat) instead of a duration, and the reaper closes sessions
+# whose heartbeats stopped; main.py starts the reaper on startup.
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class TopicStats(BaseModel):
+    topic_id: int
+    title: Optional[str]
+    minutes: int
+    session_count: int
+
+class PeriodStats(BaseModel):
+    period: str          # "YYYY-MM-DD" for days, "YYYY-Www" for weeks
+    minutes: int
+    session_count: int
+
+class StatsSummary(BaseModel):
+    total_minutes: int
+    total_sessions: int
+    average_session_minutes: int
+    most_studied: Optional[TopicStats]
+
+class StreakStats(BaseModel):
+    current_streak: int
+    longest_streak: int
+    last_study_day: Optional[date]
+
+class StatusCount(BaseModel):
+    status: str
+    count: int
@@ -0,0 +1,335 @@
+"""
+Latency/throughput baseline for the API's hot paths, driven in-process through the ASGI test client.
+
+Runs against a throwaway database with a fake PokéAPI (no network), and prints one JSON document
+with p50/p95/p99 latency and throughput per scenario, so runs can be diffed between commits
+with python -m benchmarks.compare.
+
+    python -m benchmarks.bench_api --sizes 10000,100000,1000000 --output bench.json
+    python -m benchmarks.bench_api --quick          # small sizes/iterations, for a smoke run
+
+Scenarios:
+- topics.create / topics.list (cached and uncached) / topics.get
+- sessions.cycle: POST /sessions/start, /heartbeat, /topics/{id}/add-exp then /end, every cycle evolves a fresh Bulbasaur
+- levels.*: calculate_level_from_exp / calculate_levels_from_exp microbenchmarks per growth curve
+- rows_<n>.*: list, stats and dashboard endpoints with n generated session rows,
+  plus a full archive export (GET /archive/export) and its import into an empty database
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+FIXTURE_TOPICS = 50
+FIXTURE_BATCH = 20000
+FIXTURE_SEED = 1234
+STREAM_MAX_ROWS = 100000        # the NDJSON export runs at ~6k rows/s in-process, skip it above this
+
+def summarize(timings_ms: List[float], elapsed: float) -> Dict:
+    """p50/p95/p99 latency and throughput for one scenario"""
+    if len(timings_ms) > 1:
+        cuts = statistics.quantiles(timings_ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = timings_ms[0]
+    return {
+        "n": len(timings_ms),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(statistics.fmean(timings_ms), 3),
+        "throughput_per_s": round(len(timings_ms) / elapsed, 1) if elapsed else None,
+    }
+
+def measure(call: Callable[[int], None], iterations: int, warmup: int = 5,
+            before: Optional[Callable[[int], None]] = None) -> Dict:
+    """Time call(i) iterations times; before(i) runs untimed (e.g. to invalidate a cache)"""
+    for i in range(warmup):
+        if before is not None:
+            before(i)
+        call(i)
+    timings = []
+    total = 0.0
+    for i in range(iterations):
+        if before is not None:
+            before(i)
+        start = time.perf_counter()
+        call(i)
+        took = time.perf_counter() - start
+        total += took
+        timings.append(took * 1000)
+    return summarize(timings, total)
+
+def check(response, status: int = 200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+def fake_pokemon(pokemon_id: int) -> Dict:
+    return {
+        "id": pokemon_id,
+        "name": f"Fakemon{pokemon_id}",
+        "sprite_url": f"https://example.invalid/sprites/{pokemon_id}.png",
+    }
+
+def install_fake_pokeapi(latency_ms: float) -> None:
+    """Replace the PokéAPI fetchers (sync and async) with a local stand-in"""
+    from app.pokemon.pokemon_cache import pokemon_cache
+    from app.pokemon.pokemon_client import pokemon_client
+
+    def fetch(pokemon_id: int) -> Optional[Dict]:
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return fake_pokemon(pokemon_id)
+
+    async def fetch_async(pokemon_id: int) -> Optional[Dict]:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return fake_pokemon(pokemon_id)
+
+    pokemon_cache.set_fetcher(fetch)
+    pokemon_client.set_fetcher(fetch_async)
+
+def bench_topics(client, iterations: int) -> Dict:
+    from app.response_cache import data_version
+
+    results = {}
+    results["topics.create"] = measure(
+        lambda i: check(client.post(f"/topics/?pokemon_id={1 + i % 151}", json={"title": f"topic {i}", "description": "bench"})),
+        iterations,
+    )
+    results["topics.list.cached"] = measure(lambda i: check(client.get("/topics/")), iterations)
+    results["topics.list.uncached"] = measure(lambda i: check(client.get("/topics/")), iterations,
+                                              before=lambda i: data_version.bump())
+    results["topics.list.page"] = measure(lambda i: check(client.get("/topics/?limit=50&fields=id,title,pokemon_level")),
+                                          iterations, before=lambda i: data_version.bump())
+    results["topics.get"] = measure(lambda i: check(client.get("/topics/1")), iterations,
+                                    before=lambda i: data_version.bump())
+    return results
+
+def bench_session_cycle(client, iterations: int) -> Dict:
+    """
+    start -> heartbeat -> add-exp -> end on a fresh Bulbasaur topic, the way the web client runs a session.
+    The server times sessions, so a benchmark's sessions last 0 minutes: the EXP to pass level 16
+    and evolve comes from /add-exp (buffered, it evolves at the accumulator's flush).
+    """
+    from app.exp_accumulator import exp_accumulator
+    from app.pokemon.pokemon_utils import EXP_PER_MINUTE, get_exp_for_level
+
+    minutes = get_exp_for_level(16) // EXP_PER_MINUTE + 1
+    topic_ids = [
+        check(client.post("/topics/?pokemon_id=1", json={"title": f"cycle {i}", "description": "bench"})).json()["id"]
+        for i in range(iterations + 5)
+    ]
+
+    def cycle(i: int) -> None:
+        session = check(client.post("/sessions/start", json={"topic_id": topic_ids[i]})).json()
+        check(client.post(f"/sessions/{session['id']}/heartbeat"), 204)
+        check(client.post(f"/topics/{topic_ids[i]}/add-exp", params={"minutes": minutes}))
+        check(client.post(f"/sessions/{session['id']}/end"))
+
+    timings = []
+    total = 0.0
+    for i in range(len(topic_ids)):
+        start = time.perf_counter()
+        cycle(i)
+        took = time.perf_counter() - start
+        if i >= 5:      # warmup
+            total += took
+            timings.append(took * 1000)
+    result = summarize(timings, total)
+    exp_accumulator.flush()
+    evolved = sum(check(client.get(f"/topics/{topic_id}")).json()["pokemon_id"] == 2 for topic_id in topic_ids[5:])
+    result["evolutions"] = evolved
+    return {"sessions.cycle": result}
+
+def bench_levels(iterations: int) -> Dict:
+    """Level math only, reported per call"""
+    from app.pokemon.growth_curves import GROWTH_CURVES
+    from app.pokemon.pokemon_utils import calculate_level_from_exp, calculate_levels_from_exp
+
+    rng = random.Random(FIXTURE_SEED)
+    exps = [rng.randrange(0, 1_500_000) for _ in range(1000)]
+    results = {}
+    for growth_rate in GROWTH_CURVES:
+        timer = timeit.Timer(lambda: [calculate_level_from_exp(exp, growth_rate) for exp in exps])
+        loops = max(1, iterations // 20)
+        runs = [seconds / loops / len(exps) * 1e9 for seconds in timer.repeat(repeat=5, number=loops)]
+        batch = timeit.Timer(lambda: calculate_levels_from_exp(exps, growth_rate))
+        batch_runs = [seconds / loops / len(exps) * 1e9 for seconds in batch.repeat(repeat=5, number=loops)]
+        results[f"levels.{growth_rate}"] = {
+            "ns_per_call": round(min(runs), 1),
+            "ns_per_item_batch": round(min(batch_runs), 1),
+            "calls_per_s": round(1e9 / min(runs)),
+        }
+    return results
+
+def grow_session_fixture(db_engine, current: int, target: int) -> None:
+    """Append generated completed sessions until the table holds target rows (spread over ~2 years)"""
+    from sqlalchemy import insert
+    from sqlmodel import Session, select
+    from app.models import StudySession, Topic
+    from app.rollups import rebuild_daily_rollup
+
+    rng = random.Random(FIXTURE_SEED + target)
+    with Session(db_engine) as db:
+        topic_ids = db.exec(select(Topic.id).order_by(Topic.id).limit(FIXTURE_TOPICS)).all()
+        base = datetime(2024, 1, 1)
+        for offset in range(current, target, FIXTURE_BATCH):
+            rows = []
+            for _ in range(min(FIXTURE_BATCH, target - offset)):
+                start = base + timedelta(seconds=rng.randrange(0, 730 * 86400))
+                duration = rng.randrange(5, 120)
+                rows.append({
+                    "topic_id": rng.choice(topic_ids),
+                    "start_time": start,
+                    "end_time": start + timedelta(minutes=duration),
+                    "duration_minutes": duration,
+                })
+            db.connection().execute(insert(StudySession), rows)
+            db.commit()
+        rebuild_daily_rollup(db)
+
+def bench_rows(client, size: int, iterations: int, stream_max_rows: int = STREAM_MAX_ROWS) -> Dict:
+    from app.response_cache import data_version
+
+    bump = lambda i: data_version.bump()
+    prefix = f"rows_{size}"
+    results = {}
+
+    first_page = check(client.get("/sessions/?limit=50"))
+    deep_cursor = first_page.headers.get("x-next-cursor")
+    for _ in range(20):     # walk a few pages in, so the cursor isn't at the very top
+        page = check(client.get(f"/sessions/?limit=50&cursor={deep_cursor}"))
+        deep_cursor = page.headers.get("x-next-cursor") or deep_cursor
+
+    results[f"{prefix}.sessions.first_page"] = measure(lambda i: check(client.get("/sessions/?limit=50")), iterations)
+    results[f"{prefix}.sessions.cursor_page"] = measure(
+        lambda i: check(client.get(f"/sessions/?limit=50&cursor={deep_cursor}")), iterations)
+    results[f"{prefix}.sessions.by_topic"] = measure(
+        lambda i: check(client.get(f"/sessions/?topic_id={1 + i % FIXTURE_TOPICS}&limit=50")), iterations)
+    results[f"{prefix}.topics.list"] = measure(lambda i: check(client.get("/topics/")), iterations, before=bump)
+    results[f"{prefix}.stats.summary"] = measure(lambda i: check(client.get("/stats/summary")), iterations)
+    results[f"{prefix}.stats.daily"] = measure(lambda i: check(client.get("/stats/daily")), iterations)
+    results[f"{prefix}.stats.streaks"] = measure(lambda i: check(client.get("/stats/streaks")), iterations)
+    results[f"{prefix}.dashboard"] = measure(lambda i: check(client.get("/dashboard")), iterations, before=bump)
+    results.update(bench_archive(client, prefix))
+
+    if size > stream_max_rows:
+        return results
+    # one full NDJSON export, reported as rows per second
+    start = time.perf_counter()
+    with client.stream("GET", "/sessions/?stream=true&fields=id,topic_id,start_time,duration_minutes") as response:
+        rows = sum(1 for line in response.iter_lines() if line)
+    elapsed = time.perf_counter() - start
+    results[f"{prefix}.sessions.stream"] = {"rows": rows, "seconds": round(elapsed, 3), "rows_per_s": round(rows / elapsed)}
+    return results
+
+def bench_archive(client, prefix: str) -> Dict:
+    """One full binary export through the API, then its import into a new database, as rows per second"""
+    import io
+    from app.archive import import_archive
+    from app.database import build_engine
+    from app.migrations import ensure_schema
+
+    start = time.perf_counter()
+    with client.stream("GET", "/archive/export") as response:
+        archive = b"".join(response.iter_bytes())
+    export_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        target = build_engine(f"sqlite:///{Path(tmp) / 'import.db'}", "test")
+        ensure_schema(target)
+        start = time.perf_counter()
+        counts = import_archive(io.BytesIO(archive), target)
+        import_seconds = time.perf_counter() - start
+        target.dispose()
+
+    rows = counts["sessions"]
+    return {
+        f"{prefix}.archive.export": {"rows": rows, "bytes": len(archive), "seconds": round(export_seconds, 3),
+                                     "rows_per_s": round(rows / export_seconds)},
+        f"{prefix}.archive.import": {"rows": rows, "seconds": round(import_seconds, 3),
+                                     "rows_per_s": round(rows / import_seconds)},
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="session row counts for the list benchmarks")
+    parser.add_argument("--stream-max-rows", type=int, default=STREAM_MAX_ROWS, help="skip the NDJSON export above this size")
+    parser.add_argument("--pokeapi-latency-ms", type=float, default=0, help="simulated PokéAPI latency")
+    parser.add_argument("--only", default=None, help="comma separated groups: topics,sessions,levels,rows")
+    parser.add_argument("--quick", action="store_true", help="--iterations 30 --sizes 10000")
+    parser.add_argument("--output", default=None, help="also write the JSON report to this file")
+    args = parser.parse_args()
+    if args.quick:
+        args.iterations, args.sizes = 30, "10000"
+    groups = set(args.only.split(",")) if args.only else {"topics", "sessions", "levels", "rows"}
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # must be set before app.database creates the engine
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["STUDYMON_ENV"] = "test"
+
+        from fastapi.testclient import TestClient
+        from app.database import engine
+        from app.main import app
+
+        with TestClient(app) as client:
+            install_fake_pokeapi(args.pokeapi_latency_ms)
+            # topics the row fixtures are spread over (and that topics.* then runs against)
+            for i in range(FIXTURE_TOPICS):
+                check(client.post(f"/topics/?pokemon_id={1 + i}", json={"title": f"fixture {i}", "description": "bench"}))
+
+            if "topics" in groups:
+                results.update(bench_topics(client, args.iterations))
+            if "sessions" in groups:
+                results.update(bench_session_cycle(client, args.iterations))
+            if "levels" in groups:
+                results.update(bench_levels(args.iterations))
+            if "rows" in groups:
+                from sqlmodel import Session, func, select
+                from app.models import StudySession
+                for size in sizes:
+                    with Session(engine) as db:
+                        current = db.exec(select(func.count()).select_from(StudySession)).one()
+                    start = time.perf_counter()
+                    grow_session_fixture(engine, current, size)
+                    print(f"fixture: {size} sessions ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+                    results.update(bench_rows(client, size, args.iterations, args.stream_max_rows))
+
+    report = {
+        "benchmark": "api",
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "params": vars(args),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Idle subscriber capacity of GET /events (Server-Sent Events) on one uvicorn worker.
+
+Starts the app in a uvicorn subprocess on a throwaway database, opens --subscribers idle SSE
+connections, then measures: worker memory per open stream, latency of an ordinary request
+while they're all open, and how long one event takes to reach every subscriber.
+
+    python -m benchmarks.bench_event_subscribers --subscribers 2000 --events 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def rss_kib(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+async def open_stream(port: int, types: str):
+    """An idle EventSource: request sent, headers and the retry: line read, then nothing"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /events?types={types} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    await reader.readuntil(b"retry: ")
+    await reader.readuntil(b"\n\n")
+    return reader, writer
+
+async def wait_for_event(reader, event_type: str) -> float:
+    await reader.readuntil(f"event: {event_type}\n".encode())
+    return time.perf_counter()
+
+async def run(port: int, pid: int, subscribers: int, events: int) -> dict:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        await client.post("/topics/", json={"title": "bench", "description": "bench"})
+
+        async def request_latency(samples: int = 50) -> float:
+            timings = []
+            for _ in range(samples):
+                start = time.perf_counter()
+                await client.get("/topics/1", headers={"Cache-Control": "no-cache"})
+                timings.append((time.perf_counter() - start) * 1000)
+            return round(statistics.median(timings), 2)
+
+        baseline_latency = request_latency_idle = await request_latency()
+        rss_before = rss_kib(pid)
+
+        streams = []
+        start = time.perf_counter()
+        for batch in range(0, subscribers, 200):
+            count = min(200, subscribers - batch)
+            streams += await asyncio.gather(*(open_stream(port, "topic_updated") for _ in range(count)))
+        connect_seconds = time.perf_counter() - start
+        await asyncio.sleep(1)
+        rss_after = rss_kib(pid)
+        stats = (await client.get("/events/stats")).json()
+        request_latency_busy = await request_latency()
+
+        fanout = []
+        for i in range(events):
+            waiters = [asyncio.create_task(wait_for_event(reader, "topic_updated")) for reader, _ in streams]
+            start = time.perf_counter()
+            await client.patch("/topics/1", json={"description": f"event {i}"})
+            received = await asyncio.gather(*waiters)
+            fanout.append((max(received) - start) * 1000)
+
+        for _, writer in streams:
+            writer.close()
+
+    return {
+        "open_streams": stats["subscribers"],
+        "connect_seconds": round(connect_seconds, 2),
+        "rss_growth_mib": round((rss_after - rss_before) / 1024, 1),
+        "rss_per_stream_kib": round((rss_after - rss_before) / max(subscribers, 1), 1),
+        "request_latency_ms_p50": {"no_streams": baseline_latency, "with_streams": request_latency_busy},
+        "fanout_ms_to_all": {
+            "p50": round(statistics.median(fanout), 2),
+            "max": round(max(fanout), 2),
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=20, help="events fanned out to every subscriber")
+    args = parser.parse_args()
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{Path(tmp) / 'bench.db'}", STUDYMON_ENV="test")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+             "--log-level", "warning", "--timeout-graceful-shutdown", "1"],
+            env=env,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{port}/")
+                    break
+                except httpx.ConnectError:
+                    time.sleep(0.1)
+            results = asyncio.run(run(port, server.pid, args.subscribers, args.events))
+        finally:
+            server.terminate()
+            server.wait()
+    print(json.dumps({"benchmark": "event_subscribers", "params": vars(args), "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Write throughput of concurrent users on one shared SQLite file vs one file per user (app/database.py ShardRouter).
+
+Each user is a writer thread doing end_session-like transactions (a session insert + a topic update).
+"shared" puts every user in one database file, the layout before shards, so every commit takes the
+same write lock; "sharded" routes each user to their own file through ShardRouter. Then the admin
+fan-out (routers/admin.py) is timed reading every shard one after another vs in parallel.
+Both comparisons only pull apart with more than one core: on one core, Python (not the lock) is the limit.
+
+    python -m benchmarks.bench_shards --users 8 --writes 300
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, update
+
+from app.database import ShardRouter, build_engine
+from app.migrations import ensure_schema
+from app.models import StudySession, Topic
+
+def run(engine_for, users: int, writes: int) -> dict:
+    """engine_for(user index) -> the engine that user's writes go to"""
+    topic_ids = {}
+    for user in range(users):
+        with Session(engine_for(user)) as db:
+            topic = Topic(title=f"user {user}", description="bench")
+            db.add(topic)
+            db.commit()
+            topic_ids[user] = topic.id
+
+    errors = []
+
+    def writer(user: int):
+        db_engine, topic_id = engine_for(user), topic_ids[user]
+        for _ in range(writes):
+            try:
+                with Session(db_engine) as db:
+                    db.add(StudySession(topic_id=topic_id, end_time=datetime.utcnow(), duration_minutes=1))
+                    db.exec(update(Topic).where(Topic.id == topic_id).values(minutes_spent=Topic.minutes_spent + 1))
+                    db.commit()
+            except OperationalError as e:
+                errors.append(str(e.orig))
+
+    threads = [threading.Thread(target=writer, args=(user,)) for user in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    committed = users * writes - len(errors)
+    return {
+        "seconds": round(elapsed, 3),
+        "committed_writes": committed,
+        "failed_writes": len(errors),
+        "writes_per_second": round(committed / elapsed, 1),
+    }
+
+def time_fanout(router: ShardRouter, workers: int) -> float:
+    from app.routers.admin import shard_totals
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(partial(shard_totals, router=router), router.users()))
+    return round((time.perf_counter() - start) * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8, help="concurrent writer threads, one per user")
+    parser.add_argument("--writes", type=int, default=300, help="transactions per user")
+    parser.add_argument("--profile", default="production", help="engine profile (see ENGINE_PROFILES)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = build_engine(f"sqlite:///{Path(tmp) / 'shared.db'}", args.profile)
+        ensure_schema(shared)
+        results["shared"] = run(lambda user: shared, args.users, args.writes)
+        shared.dispose()
+
+        router = ShardRouter(Path(tmp) / "shards", max_open=args.users)
+        for user in range(args.users):
+            router.create(f"user{user}")
+        results["sharded"] = run(lambda user: router.engine_for(f"user{user}"), args.users, args.writes)
+        results["speedup"] = round(results["sharded"]["writes_per_second"] / max(results["shared"]["writes_per_second"], 0.1), 2)
+
+        time_fanout(router, args.users)     # warm up: first reads of each file
+        results["admin_fanout_ms"] = {"serial": time_fanout(router, 1), "parallel": time_fanout(router, args.users)}
+        router.close()
+    print(json.dumps({"benchmark": "shards", "params": vars(args), "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Write throughput of the SQLite engine before/after the engine profiles in app/database.py.
+
+"before" is the original engine (create_engine(url): rollback journal, default pragmas and pooling),
+"after" is build_engine(url, "production"). Both run the same mix of writer threads (one session
+insert + topic update per transaction, like end_session) against readers listing sessions.
+
+    python -m benchmarks.bench_sqlite_profile --writers 8 --readers 4 --writes 200
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine, select, update
+
+from app.database import build_engine
+from app.models import StudySession, Topic
+
+def run(db_engine, writers: int, readers: int, writes: int) -> dict:
+    SQLModel.metadata.create_all(db_engine)
+    with Session(db_engine) as db:
+        for i in range(writers):
+            db.add(Topic(title=f"topic {i}", description="bench"))
+        db.commit()
+
+    errors = []
+    done = threading.Event()
+
+    def writer(topic_id: int):
+        for _ in range(writes):
+            try:
+                with Session(db_engine) as db:
+                    db.add(StudySession(topic_id=topic_id, end_time=datetime.utcnow(), duration_minutes=1))
+                    db.exec(update(Topic).where(Topic.id == topic_id).values(minutes_spent=Topic.minutes_spent + 1))
+                    db.commit()
+            except OperationalError as e:
+                errors.append(str(e.orig))
+
+    def reader():
+        while not done.is_set():
+            with Session(db_engine) as db:
+                db.exec(select(StudySession).order_by(StudySession.id.desc()).limit(50)).all()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i + 1,)) for i in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    db_engine.dispose()
+
+    committed = writers * writes - len(errors)
+    return {
+        "seconds": round(elapsed, 3),
+        "committed_writes": committed,
+        "failed_writes": len(errors),
+        "writes_per_second": round(committed / elapsed, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=200, help="transactions per writer thread")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url_before = f"sqlite:///{Path(tmp) / 'before.db'}"
+        url_after = f"sqlite:///{Path(tmp) / 'after.db'}"
+        results["before"] = run(create_engine(url_before), args.writers, args.readers, args.writes)
+        results["after"] = run(build_engine(url_after, "production"), args.writers, args.readers, args.writes)
+    results["speedup"] = round(results["after"]["writes_per_second"] / max(results["before"]["writes_per_second"], 0.1), 2)
+    print(json.dumps({"benchmark": "sqlite_profile", "params": vars(args), "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
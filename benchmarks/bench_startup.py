@@ -0,0 +1,102 @@
+"""
+Cold-start latency of a worker: how long until a fresh process can answer its first request.
+
+Each run is a new process on a throwaway database, measured three ways:
+- import: time to import app.main (routers, models, dependencies)
+- lifespan: time spent in the app's startup hook, before it can serve (schema check/DDL, background tasks)
+- first_response: uvicorn spawned -> first 200 from GET /, for a brand new database (DDL path)
+  and for an existing, up-to-date one (schema version matches, no DDL) - the autoscaling case
+
+    python -m benchmarks.bench_startup --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.bench_api import git_commit, summarize
+
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+LIFESPAN_SNIPPET = """
+import asyncio, time
+from app.main import app, lifespan
+async def startup():
+    start = time.perf_counter()
+    async with lifespan(app):
+        print(time.perf_counter() - start)
+asyncio.run(startup())
+"""
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_snippet(snippet: str, env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", snippet], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def time_first_response(env: dict, timeout: float = 30) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get("/").status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", default=None, help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    imports, lifespan_fresh, lifespan_existing, fresh, existing = [], [], [], [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        base_env = dict(os.environ, STUDYMON_ENV="production")
+        for run in range(args.runs):
+            env = dict(base_env, DATABASE_URL=f"sqlite:///{Path(tmp) / f'import-{run}.db'}")
+            imports.append(time_snippet(IMPORT_SNIPPET, env) * 1000)
+            lifespan_fresh.append(time_snippet(LIFESPAN_SNIPPET, env) * 1000)
+            lifespan_existing.append(time_snippet(LIFESPAN_SNIPPET, env) * 1000)
+
+            env = dict(base_env, DATABASE_URL=f"sqlite:///{Path(tmp) / f'fresh-{run}.db'}")
+            fresh.append(time_first_response(env) * 1000)
+            existing.append(time_first_response(env) * 1000)    # same database again: schema is current now
+
+    results = {
+        "import": summarize(imports, sum(imports) / 1000),
+        "lifespan.new_database": summarize(lifespan_fresh, sum(lifespan_fresh) / 1000),
+        "lifespan.existing_database": summarize(lifespan_existing, sum(lifespan_existing) / 1000),
+        "first_response.new_database": summarize(fresh, sum(fresh) / 1000),
+        "first_response.existing_database": summarize(existing, sum(existing) / 1000),
+    }
+    for result in results.values():
+        result.pop("throughput_per_s", None)
+    report = {"benchmark": "startup", "commit": git_commit(), "params": vars(args), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare two benchmark reports (e.g. from two commits) and flag regressions.
+
+Latency scenarios compare p50/p95/p99, microbenchmarks compare ns per call, exports compare rows per second.
+Exits non-zero when any metric got worse by more than --threshold percent.
+
+    python -m benchmarks.bench_api --output before.json     # on the old commit
+    python -m benchmarks.bench_api --output after.json      # on the new commit
+    python -m benchmarks.compare before.json after.json --threshold 15
+"""
+import argparse
+import json
+import sys
+
+# metric -> True if bigger is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "ns_per_call": False,
+    "ns_per_item_batch": False,
+    "rows_per_s": True,
+}
+
+def compare(before: dict, after: dict, threshold: float):
+    """Yields (scenario, metric, before, after, percent change, regressed) for metrics in both reports"""
+    for scenario, new in after["results"].items():
+        old = before["results"].get(scenario)
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in old or metric not in new or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            yield scenario, metric, old[metric], new[metric], change, worse > threshold
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    regressions = 0
+    print(f"{'scenario':44} {'metric':18} {'before':>12} {'after':>12} {'change':>9}")
+    for scenario, metric, old, new, change, regressed in compare(before, after, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{scenario:44} {metric:18} {old:>12} {new:>12} {change:>+8.1f}%{flag}")
+    print(f"\n{before.get('commit')} -> {after.get('commit')}: {regressions} regression(s) over {args.threshold}%")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Concurrency stress check for POST /sessions/{id}/end.
+
+Starts many sessions on one topic, ends them all in parallel threads and verifies the topic's
+minutes_spent and pokemon_exp are exactly the sum of the durations (no lost updates).
+Every session's start_time is moved back just before the ends (the clock the server measures against).
+Even sessions are timed by the server: they send a heartbeat and started `duration` minutes ago.
+Odd sessions act like older clients: no heartbeat, they started a few minutes earlier and send
+duration_minutes to /end, which may shorten the server's count but not exceed it. A session that
+claims more minutes than it lasted must get only the elapsed time.
+Runs against a throwaway database and exits non-zero on a mismatch.
+
+    python -m benchmarks.stress_end_session --sessions 500 --threads 16
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+CLIENT_PAUSED_MINUTES = 3
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # must be set before app.database creates the engine
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'stress.db'}"
+        os.environ.setdefault("STUDYMON_ENV", "test")
+
+        from fastapi.testclient import TestClient
+        from sqlmodel import Session, update
+        from app.database import engine
+        from app.main import app
+        from app.models import StudySession
+        from app.pokemon.pokemon_utils import EXP_PER_MINUTE
+
+        with TestClient(app) as client:
+            topic = client.post("/topics/?pokemon_id=1", json={"title": "stress", "description": "stress"}).json()
+            session_ids = [
+                client.post("/sessions/start", json={"topic_id": topic["id"]}).json()["id"]
+                for _ in range(args.sessions)
+            ]
+            durations = {session_id: 1 + session_id % 7 for session_id in session_ids}
+            timed = [session_id for session_id in session_ids if session_id % 2 == 0]
+            for session_id in timed:
+                client.post(f"/sessions/{session_id}/heartbeat")
+
+            # started `duration` minutes ago (older clients: paused for CLIENT_PAUSED_MINUTES on top),
+            # the ends below all land within that minute
+            now = datetime.utcnow()
+            with Session(engine) as db:
+                for session_id in session_ids:
+                    minutes = durations[session_id] + (0 if session_id % 2 == 0 else CLIENT_PAUSED_MINUTES)
+                    db.exec(update(StudySession).where(StudySession.id == session_id)
+                            .values(start_time=now - timedelta(minutes=minutes)))
+                db.commit()
+
+            def end(session_id):
+                if session_id % 2 == 0:     # server timed: no body
+                    return client.post(f"/sessions/{session_id}/end").status_code
+                return client.post(f"/sessions/{session_id}/end", json={"duration_minutes": durations[session_id]}).status_code
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as pool:
+                statuses = list(pool.map(end, session_ids))
+            elapsed = time.perf_counter() - start
+
+            # ending a session twice must not count it twice
+            repeat_status = end(session_ids[0])
+            result = client.get(f"/topics/{topic['id']}").json()
+
+            # a client can't claim more than the session lasted (on another topic, outside the totals)
+            other = client.post("/topics/", json={"title": "claims", "description": "stress"}).json()
+            claim = client.post("/sessions/start", json={"topic_id": other["id"]}).json()["id"]
+            over_limit_status = client.post(f"/sessions/{claim}/end", json={"duration_minutes": 100000}).status_code
+            claimed_minutes = client.post(f"/sessions/{claim}/end", json={"duration_minutes": 600}).json()["duration_minutes"]
+
+    expected_minutes = sum(durations.values())
+    report = {
+        "sessions": args.sessions,
+        "server_timed": len(timed),
+        "threads": args.threads,
+        "seconds": round(elapsed, 3),
+        "ends_per_second": round(args.sessions / elapsed, 1),
+        "failed_requests": sum(status != 200 for status in statuses),
+        "repeat_end_status": repeat_status,
+        "minutes_spent": result["minutes_spent"],
+        "expected_minutes": expected_minutes,
+        "pokemon_exp": result["pokemon_exp"],
+        "expected_exp": expected_minutes * EXP_PER_MINUTE,
+        "over_limit_claim_status": over_limit_status,
+        "inflated_claim_minutes": claimed_minutes,
+    }
+    ok = (
+        report["failed_requests"] == 0
+        and repeat_status == 400
+        and report["minutes_spent"] == expected_minutes
+        and report["pokemon_exp"] == report["expected_exp"]
+        and over_limit_status == 422
+        and claimed_minutes == 0
+    )
+    report["ok"] = ok
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
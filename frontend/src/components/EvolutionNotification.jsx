@@ -32,7 +32,7 @@ function EvolutionNotification({ evolutionData, onClose }) {
             <h2>What's happening?!</h2>
             <div className="evolution-sprite">
               <img 
-                src={`https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/${evolutionData.from_id}.png`}
+                src={`http://localhost:8000/pokemon/${evolutionData.from_id}/sprite`}
                 alt={evolutionData.from_name}
                 className="sprite-flash"
               />
@@ -56,7 +56,7 @@ function EvolutionNotification({ evolutionData, onClose }) {
             <h2>Congratulations!</h2>
             <div className="evolution-sprite complete">
               <img 
-                src={`https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/${evolutionData.to_id}.png`}
+                src={`http://localhost:8000/pokemon/${evolutionData.to_id}/sprite`}
                 alt={evolutionData.to_name}
                 className="sprite-appear"
               />
@@ -6,32 +6,24 @@ function AcePokemonBar() {
 
   useEffect(() => {
     fetchAcePokemon();
+
+    // one server-sent event stream instead of polling: refetch only when the ace could have changed
+    const events = new EventSource(
+      'http://localhost:8000/events?types=topic_created,topic_updated,topic_deleted,topic_progress,session_ended,sessions_uploaded'
+    );
+    const refresh = () => fetchAcePokemon();
+    ['topic_created', 'topic_updated', 'topic_deleted', 'topic_progress', 'session_ended', 'sessions_uploaded', 'lagged']
+      .forEach(type => events.addEventListener(type, refresh));
+    return () => events.close();
   }, []);
 
   const fetchAcePokemon = async () => {
     try {
-      const response = await fetch('http://localhost:8000/topics/');
-      const topics = await response.json();
-
-      // Filter topics that have Pokémon
-      const topicsWithPokemon = topics.filter(t => t.pokemon_id);
-
-      if (topicsWithPokemon.length === 0) {
-        setAcePokemon(null);
-        setLoading(false);
-        return;
-      }
-
-      // Find the highest level Pokémon (ace)
-      const ace = topicsWithPokemon.reduce((highest, current) => {
-        if (current.pokemon_level > highest.pokemon_level) return current;
-        if (current.pokemon_level === highest.pokemon_level && current.pokemon_exp > highest.pokemon_exp) {
-          return current;
-        }
-        return highest;
-      });
-
-      setAcePokemon(ace);
+      // the ace is #1 on the level leaderboard (highest level, then EXP), sent with its level EXP bounds
+      const response = await fetch('http://localhost:8000/leaderboard/level?limit=1');
+      const { entries } = await response.json();
+
+      setAcePokemon(entries[0] || null);
     } catch (err) {
       console.error('Error fetching ace Pokémon:', err);
     } finally {
@@ -39,39 +31,24 @@ function AcePokemonBar() {
     }
   };
 
-  const getExpForNextLevel = (level) => {
-    return Math.pow(level + 1, 3);
-  };
-
-  const getExpForCurrentLevel = (level) => {
-    return Math.pow(level, 3);
-  };
-
-  const calculateExpProgress = () => {
-    if (!acePokemon) return 0;
-    
-    const currentLevelExp = getExpForCurrentLevel(acePokemon.pokemon_level);
-    const nextLevelExp = getExpForNextLevel(acePokemon.pokemon_level);
-    const expInCurrentLevel = acePokemon.pokemon_exp - currentLevelExp;
-    const expNeededForLevel = nextLevelExp - currentLevelExp;
-    
-    return (expInCurrentLevel / expNeededForLevel) * 100;
-  };
-
+  // level bounds come from the server, which knows the topic's growth curve
   const getExpStats = () => {
     if (!acePokemon) return { current: 0, needed: 0 };
-    
-    const currentLevelExp = getExpForCurrentLevel(acePokemon.pokemon_level);
-    const nextLevelExp = getExpForNextLevel(acePokemon.pokemon_level);
-    const expInCurrentLevel = acePokemon.pokemon_exp - currentLevelExp;
-    const expNeededForLevel = nextLevelExp - currentLevelExp;
-    
+
+    const currentLevelExp = acePokemon.exp_for_current_level;
+    const nextLevelExp = acePokemon.exp_for_next_level;
+
     return {
-      current: expInCurrentLevel,
-      needed: expNeededForLevel
+      current: acePokemon.pokemon_exp - currentLevelExp,
+      needed: nextLevelExp - currentLevelExp
     };
   };
 
+  const calculateExpProgress = () => {
+    const { current, needed } = getExpStats();
+    return needed > 0 ? (current / needed) * 100 : 100;
+  };
+
   if (loading) {
     return (
       <div className="ace-bar loading">
@@ -97,7 +74,7 @@ function AcePokemonBar() {
         <div className="ace-pokemon-info">
           <div className="ace-sprite-container">
             <img 
-              src={acePokemon.pokemon_sprite_url} 
+              src={`http://localhost:8000/pokemon/${acePokemon.pokemon_id}/sprite`} 
               alt={acePokemon.pokemon_name}
               className="ace-sprite"
             />
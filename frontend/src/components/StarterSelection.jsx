@@ -85,7 +85,12 @@ function StarterSelection({ onStarterSelected }) {
             onClick={() => handleStarterClick(starter)}
           >
             <div className="starter-sprite">
-              <img src={starter.sprite_url} alt={starter.name} />
+              {/* all starters come from the one Gen 1 sprite sheet download */}
+              <img
+                src={`http://localhost:8000/pokemon/sprites/gen1.svg#pokemon-${starter.id}`}
+                alt={starter.name}
+                onError={(e) => { e.currentTarget.onerror = null; e.currentTarget.src = starter.sprite_url; }}
+              />
             </div>
             <h3>{starter.name}</h3>
             <div className="starter-number">#{starter.id.toString().padStart(3, '0')}</div>
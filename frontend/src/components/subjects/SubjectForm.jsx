@@ -11,12 +11,9 @@ function SubjectForm({ onTopicCreated }) {
   const enterSafariZone = async () => {
     setLoading(true);
     try {
-      // Fetch 3 random Pokémon
-      const pokemon = await Promise.all([
-        fetch('http://localhost:8000/pokemon/random/encounter').then(r => r.json()),
-        fetch('http://localhost:8000/pokemon/random/encounter').then(r => r.json()),
-        fetch('http://localhost:8000/pokemon/random/encounter').then(r => r.json())
-      ]);
+      // Fetch 3 distinct random Pokémon in one request
+      const response = await fetch('http://localhost:8000/pokemon/encounters?count=3');
+      const pokemon = await response.json();
       
       setSafariPokemon(pokemon);
       setShowSafariZone(true);
@@ -124,7 +121,12 @@ function SubjectForm({ onTopicCreated }) {
                   onClick={() => handlePokemonSelect(pokemon)}
                 >
                   <div className="safari-sprite">
-                    <img src={pokemon.sprite_url} alt={pokemon.name} />
+                    {/* every encounter comes from the one Gen 1 sprite sheet download */}
+                    <img
+                      src={`http://localhost:8000/pokemon/sprites/gen1.svg#pokemon-${pokemon.id}`}
+                      alt={pokemon.name}
+                      onError={(e) => { e.currentTarget.onerror = null; e.currentTarget.src = pokemon.sprite_url; }}
+                    />
                   </div>
                   <h4>{pokemon.name}</h4>
                   <div className="safari-number">#{pokemon.id.toString().padStart(3, '0')}</div>
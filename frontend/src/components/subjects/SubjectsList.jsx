@@ -95,7 +95,7 @@ function SubjectsList() {
               <div className="pokemon-section">
                 <div className="pokemon-sprite-container">
                   <img 
-                    src={topic.pokemon_sprite_url} 
+                    src={`http://localhost:8000/pokemon/${topic.pokemon_id}/sprite`} 
                     alt={topic.pokemon_name}
                     className="pokemon-sprite"
                   />
@@ -14,8 +14,8 @@ function History() {
   const fetchData = async () => {
     setLoading(true);
     try {
-      // Fetch topics
-      const topicsRes = await fetch('http://localhost:8000/topics/');
+      // Fetch topics (only the fields the filter and cards need)
+      const topicsRes = await fetch('http://localhost:8000/topics/?fields=id,title');
       const topicsData = await topicsRes.json();
       setTopics(topicsData);
 
@@ -28,12 +28,8 @@ function History() {
       const sessionsRes = await fetch(url);
       const sessionsData = await sessionsRes.json();
       
-      // Sort by most recent first
-      const sortedSessions = sessionsData.sort((a, b) => 
-        new Date(b.start_time) - new Date(a.start_time)
-      );
-      
-      setSessions(sortedSessions);
+      // Already sorted by most recent first
+      setSessions(sessionsData);
     } catch (err) {
       console.error('Error fetching history:', err);
     } finally {
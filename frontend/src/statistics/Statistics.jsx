@@ -1,27 +1,44 @@
 import React, { useState, useEffect } from 'react';
 
 function Statistics() {
-  const [topics, setTopics] = useState([]);
-  const [sessions, setSessions] = useState([]);
+  const [summary, setSummary] = useState(null);
+  const [topicStats, setTopicStats] = useState([]);
+  const [dailyStats, setDailyStats] = useState([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Format a Date as a local YYYY-MM-DD string
+  const toDateString = (date) => {
+    const month = String(date.getMonth() + 1).padStart(2, '0');
+    const day = String(date.getDate()).padStart(2, '0');
+    return `${date.getFullYear()}-${month}-${day}`;
+  };
+
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [topicsRes, sessionsRes] = await Promise.all([
-        fetch('http://localhost:8000/topics/'),
-        fetch('http://localhost:8000/sessions/')
-      ]);
+      // Aggregation happens server-side, so these stay small however long the history is
+      const weekStart = new Date();
+      weekStart.setDate(weekStart.getDate() - 6);
+      const tzOffset = -new Date().getTimezoneOffset();
 
-      const topicsData = await topicsRes.json();
-      const sessionsData = await sessionsRes.json();
+      const [summaryRes, topicsRes, dailyRes] = await Promise.all([
+        fetch('http://localhost:8000/stats/summary'),
+        fetch('http://localhost:8000/stats/topics'),
+        fetch(`http://localhost:8000/stats/daily?start=${toDateString(weekStart)}&tz_offset_minutes=${tzOffset}`)
+      ]);
 
-      setTopics(topicsData);
-      setSessions(sessionsData);
+      setSummary(await summaryRes.json());
+      setTopicStats((await topicsRes.json()).map(stat => ({
+        topicId: stat.topic_id,
+        topicName: stat.title || 'Unknown',
+        minutes: stat.minutes,
+        sessionCount: stat.session_count
+      })));
+      setDailyStats(await dailyRes.json());
     } catch (err) {
       console.error('Error fetching statistics:', err);
     } finally {
@@ -29,77 +46,24 @@ function Statistics() {
     }
   };
 
-  // Calculate total study time
-  const getTotalMinutes = () => {
-    return sessions.reduce((total, session) => total + session.duration_minutes, 0);
-  };
-
-  // Calculate average session length
-  const getAverageSessionLength = () => {
-    if (sessions.length === 0) return 0;
-    return Math.round(getTotalMinutes() / sessions.length);
-  };
-
-  // Get study time per topic
-  const getTopicStats = () => {
-    const stats = {};
-    
-    sessions.forEach(session => {
-      if (!stats[session.topic_id]) {
-        stats[session.topic_id] = {
-          minutes: 0,
-          sessionCount: 0
-        };
-      }
-      stats[session.topic_id].minutes += session.duration_minutes;
-      stats[session.topic_id].sessionCount += 1;
-    });
-
-    return Object.entries(stats).map(([topicId, data]) => {
-      const topic = topics.find(t => t.id === parseInt(topicId));
-      return {
-        topicId: parseInt(topicId),
-        topicName: topic ? topic.title : 'Unknown',
-        minutes: data.minutes,
-        sessionCount: data.sessionCount
-      };
-    }).sort((a, b) => b.minutes - a.minutes);
-  };
-
-  // Get most studied topic
-  const getMostStudiedTopic = () => {
-    const topicStats = getTopicStats();
-    return topicStats.length > 0 ? topicStats[0] : null;
-  };
-
   // Get study time for last 7 days
   const getLast7DaysData = () => {
     const last7Days = [];
     const today = new Date();
     today.setHours(0, 0, 0, 0);
 
-    // Create array of last 7 days
+    // Create array of last 7 days, filled from the per-day totals
     for (let i = 6; i >= 0; i--) {
       const date = new Date(today);
       date.setDate(date.getDate() - i);
+      const dayData = dailyStats.find(day => day.period === toDateString(date));
       last7Days.push({
         date: date,
         dateString: date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-        minutes: 0
+        minutes: dayData ? dayData.minutes : 0
       });
     }
 
-    // Add session minutes to corresponding days
-    sessions.forEach(session => {
-      const sessionDate = new Date(session.start_time);
-      sessionDate.setHours(0, 0, 0, 0);
-      
-      const dayData = last7Days.find(day => day.date.getTime() === sessionDate.getTime());
-      if (dayData) {
-        dayData.minutes += session.duration_minutes;
-      }
-    });
-
     return last7Days;
   };
 
@@ -110,8 +74,7 @@ function Statistics() {
     return `${hours}h ${mins}m`;
   };
 
-  const topicStats = getTopicStats();
-  const mostStudied = getMostStudiedTopic();
+  const mostStudied = topicStats.length > 0 ? topicStats[0] : null;
   const last7DaysData = getLast7DaysData();
   const maxDayMinutes = Math.max(...last7DaysData.map(d => d.minutes), 1);
 
@@ -119,7 +82,7 @@ function Statistics() {
     return <div className="loading">Loading statistics...</div>;
   }
 
-  if (sessions.length === 0) {
+  if (!summary || summary.total_sessions === 0) {
     return (
       <div className="statistics-container">
         <h2>Statistics</h2>
@@ -137,17 +100,17 @@ function Statistics() {
       {/* Overview Cards */}
       <div className="stats-overview">
         <div className="stat-card">
-          <div className="stat-value">{formatTime(getTotalMinutes())}</div>
+          <div className="stat-value">{formatTime(summary.total_minutes)}</div>
           <div className="stat-label">Total Study Time</div>
         </div>
         
         <div className="stat-card">
-          <div className="stat-value">{sessions.length}</div>
+          <div className="stat-value">{summary.total_sessions}</div>
           <div className="stat-label">Total Sessions</div>
         </div>
         
         <div className="stat-card">
-          <div className="stat-value">{formatTime(getAverageSessionLength())}</div>
+          <div className="stat-value">{formatTime(summary.average_session_minutes)}</div>
           <div className="stat-label">Average Session</div>
         </div>
         
@@ -30,6 +30,17 @@ function Timer() {
     return () => clearInterval(interval);
   }, [isRunning, seconds]);
 
+  // Heartbeat: the server times the session, this keeps it from being closed as abandoned
+  // (and tells it when the timer is paused, so paused time isn't counted)
+  useEffect(() => {
+    if (!activeSessionId) return;
+    const beat = () => fetch(`http://localhost:8000/sessions/${activeSessionId}/heartbeat?paused=${!isRunning}`, { method: 'POST' })
+      .catch(err => console.error('Error sending heartbeat:', err));
+    beat();
+    const interval = setInterval(beat, 30000);
+    return () => clearInterval(interval);
+  }, [activeSessionId, isRunning]);
+
   const formatTime = (totalSeconds) => {
     const mins = Math.floor(totalSeconds / 60);
     const secs = totalSeconds % 60;
@@ -71,18 +82,16 @@ function Timer() {
   const handleStop = async () => {
     if (!activeSessionId) return;
 
-    const durationMinutes = Math.floor(seconds / 60);
-
     try {
+      // no duration sent: the server computes it from the session's start time and pauses
       const response = await fetch(`http://localhost:8000/sessions/${activeSessionId}/end`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ duration_minutes: durationMinutes })
+        method: 'POST'
       });
 
       if (!response.ok) throw new Error('Failed to end session');
 
       const data = await response.json();
+      const durationMinutes = data.duration_minutes;
 
       // Check if evolution happened
       if (data.evolution) {